@@ -0,0 +1,39 @@
+"""Add scrape_jobs table
+
+Revision ID: 003_add_scrape_jobs
+Revises: 002_add_failure_reason
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '003_add_scrape_jobs'
+down_revision = '002_add_failure_reason'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('scrape_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('search_url', sa.String(), nullable=False),
+    sa.Column('max_results', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'COMPLETED', 'FAILED', name='scrapejobstatus'), nullable=False),
+    sa.Column('next_page', sa.Integer(), nullable=False, server_default='1'),
+    sa.Column('profiles_found', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('profiles_created', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scrape_jobs_id'), 'scrape_jobs', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_scrape_jobs_id'), table_name='scrape_jobs')
+    op.drop_table('scrape_jobs')
+    sa.Enum(name='scrapejobstatus').drop(op.get_bind(), checkfirst=True)
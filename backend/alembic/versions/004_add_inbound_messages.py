@@ -0,0 +1,43 @@
+"""Add inbound_messages table
+
+Revision ID: 004_add_inbound_messages
+Revises: 003_add_scrape_jobs
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '004_add_inbound_messages'
+down_revision = '003_add_scrape_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('inbound_messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('thread_url', sa.String(), nullable=False),
+    sa.Column('profile_url', sa.String(), nullable=True),
+    sa.Column('participant_name', sa.String(), nullable=True),
+    sa.Column('connection_id', sa.Integer(), nullable=True),
+    sa.Column('snippet', sa.Text(), nullable=True),
+    sa.Column('last_inbound_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['connection_id'], ['connections.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_inbound_messages_id'), 'inbound_messages', ['id'], unique=False)
+    op.create_index(op.f('ix_inbound_messages_thread_url'), 'inbound_messages', ['thread_url'], unique=True)
+    op.create_index(op.f('ix_inbound_messages_profile_url'), 'inbound_messages', ['profile_url'], unique=False)
+    op.create_index(op.f('ix_inbound_messages_connection_id'), 'inbound_messages', ['connection_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_inbound_messages_connection_id'), table_name='inbound_messages')
+    op.drop_index(op.f('ix_inbound_messages_profile_url'), table_name='inbound_messages')
+    op.drop_index(op.f('ix_inbound_messages_thread_url'), table_name='inbound_messages')
+    op.drop_index(op.f('ix_inbound_messages_id'), table_name='inbound_messages')
+    op.drop_table('inbound_messages')
@@ -0,0 +1,34 @@
+"""Make followups.message_id unique
+
+Revision ID: 005_unique_followup_message
+Revises: 004_add_inbound_messages
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_unique_followup_message'
+down_revision = '004_add_inbound_messages'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Of a message scheduled more than once, keep the follow-up that was sent,
+    # else the pending one, else the oldest, so history is never rewritten
+    op.execute(
+        "DELETE FROM followups WHERE id IN ("
+        "SELECT id FROM ("
+        "SELECT id, ROW_NUMBER() OVER ("
+        "PARTITION BY message_id "
+        "ORDER BY CASE status WHEN 'SENT' THEN 0 WHEN 'PENDING' THEN 1 ELSE 2 END, id"
+        ") AS position FROM followups"
+        ") AS ranked WHERE position > 1)"
+    )
+    op.create_index(op.f('ix_followups_message_id'), 'followups', ['message_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_followups_message_id'), table_name='followups')
@@ -0,0 +1,23 @@
+"""Add claimed_at to followups
+
+Revision ID: 006_add_followup_claimed_at
+Revises: 005_unique_followup_message
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_add_followup_claimed_at'
+down_revision = '005_unique_followup_message'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('followups', sa.Column('claimed_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('followups', 'claimed_at')
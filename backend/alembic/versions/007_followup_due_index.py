@@ -0,0 +1,23 @@
+"""Index followups by status and scheduled_at
+
+Revision ID: 007_followup_due_index
+Revises: 006_add_followup_claimed_at
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '007_followup_due_index'
+down_revision = '006_add_followup_claimed_at'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_followups_status_scheduled_at', 'followups', ['status', 'scheduled_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_followups_status_scheduled_at', table_name='followups')
@@ -0,0 +1,27 @@
+"""Add retry bookkeeping to connections
+
+Revision ID: 008_add_connection_retries
+Revises: 007_followup_due_index
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '008_add_connection_retries'
+down_revision = '007_followup_due_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('connections', sa.Column('attempt_count', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('connections', sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_connections_status_next_attempt_at', 'connections', ['status', 'next_attempt_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_connections_status_next_attempt_at', table_name='connections')
+    op.drop_column('connections', 'next_attempt_at')
+    op.drop_column('connections', 'attempt_count')
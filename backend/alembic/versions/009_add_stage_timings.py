@@ -0,0 +1,44 @@
+"""Add stage_timings table
+
+Revision ID: 009_add_stage_timings
+Revises: 008_add_connection_retries
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '009_add_stage_timings'
+down_revision = '008_add_connection_retries'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('stage_timings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('pipeline', sa.String(), nullable=False),
+    sa.Column('run_id', sa.String(), nullable=False),
+    sa.Column('connection_id', sa.Integer(), nullable=True),
+    sa.Column('followup_id', sa.Integer(), nullable=True),
+    sa.Column('stage', sa.String(), nullable=False),
+    sa.Column('outcome', sa.String(), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('duration_ms', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_stage_timings_id'), 'stage_timings', ['id'], unique=False)
+    op.create_index(op.f('ix_stage_timings_run_id'), 'stage_timings', ['run_id'], unique=False)
+    op.create_index(op.f('ix_stage_timings_connection_id'), 'stage_timings', ['connection_id'], unique=False)
+    op.create_index('ix_stage_timings_pipeline_stage_started_at', 'stage_timings', ['pipeline', 'stage', 'started_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stage_timings_pipeline_stage_started_at', table_name='stage_timings')
+    op.drop_index(op.f('ix_stage_timings_connection_id'), table_name='stage_timings')
+    op.drop_index(op.f('ix_stage_timings_run_id'), table_name='stage_timings')
+    op.drop_index(op.f('ix_stage_timings_id'), table_name='stage_timings')
+    op.drop_table('stage_timings')
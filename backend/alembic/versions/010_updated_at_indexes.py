@@ -0,0 +1,27 @@
+"""Index updated_at of profiles, connections and inbound_messages
+
+Revision ID: 010_updated_at_indexes
+Revises: 009_add_stage_timings
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '010_updated_at_indexes'
+down_revision = '009_add_stage_timings'
+branch_labels = None
+depends_on = None
+
+TABLES = ('profiles', 'connections', 'inbound_messages')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.create_index(f'ix_{table}_updated_at', table, ['updated_at'])
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_updated_at', table_name=table)
@@ -0,0 +1,31 @@
+"""Add leader_tasks table
+
+Revision ID: 011_add_leader_tasks
+Revises: 010_updated_at_indexes
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '011_add_leader_tasks'
+down_revision = '010_updated_at_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('leader_tasks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task', sa.String(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_leader_tasks_id'), 'leader_tasks', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_leader_tasks_id'), table_name='leader_tasks')
+    op.drop_table('leader_tasks')
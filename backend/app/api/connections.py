@@ -1,12 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.database import get_db, SessionLocal
+from app.database import get_db, session_scope
 from app.models.profile import Profile
 from app.models.connection import Connection, ConnectionStatus
 from app.models.message import Message, MessageType
 from app.services.linkedin import linkedin_service
+from app.services.browser_executor import browser_executor, ActionPriority
 from app.services.message_generator import message_generator
+from app.services.scheduler import followup_scheduling_worker, connection_retry_worker
+from app.services.stage_timer import StageTrace
+from app.services.profiling import profile_when_armed
+from app.services.retry_policy import is_transient_failure, record_failed_attempt, record_successful_attempt
+from app.services.leader import leader
 from app.config import settings
 from pydantic import BaseModel
 import asyncio
@@ -25,6 +32,8 @@ class ConnectionResponse(BaseModel):
     connection_message: Optional[str] = None
     connection_message_sent_at: Optional[str] = None
     failure_reason: Optional[str] = None
+    attempt_count: int = 0
+    next_attempt_at: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -35,107 +44,159 @@ class StartConnectionRequest(BaseModel):
 
 
 class RetryConnectionRequest(BaseModel):
-    connection_ids: Optional[List[int]] = None  # If None, retry all failed connections
+    connection_ids: Optional[List[int]] = None  # If None, retry all failed connections whose failure is transient
 
 
+@profile_when_armed("process_connection")
 async def process_connection(profile_id: int):
-    """Background task to process a single connection"""
-    db = SessionLocal()
+    """
+    Background task to process a single connection
+
+    Database work happens in short session_scope() bursts between the browser
+    and LLM calls, so no pool connection is held through the rate-limit
+    sleep or the LinkedIn navigation. Each stage is timed into stage_timings.
+    """
+    became_connected = False
+    retry_scheduled = False
+    connection_id = None
+    trace = StageTrace("connection")
     try:
-        profile = db.query(Profile).filter(Profile.id == profile_id).first()
-        if not profile:
-            return
-
-        # Check if connection already exists and is connected
-        existing = db.query(Connection).filter(Connection.profile_id == profile_id).first()
-        if existing and existing.status == ConnectionStatus.CONNECTED:
-            # Already connected, no need to retry
-            return
-
-        # Create or update connection
-        if not existing:
-            connection = Connection(
-                profile_id=profile_id,
-                status=ConnectionStatus.CONNECTING
-            )
-            db.add(connection)
-            db.commit()
-            db.refresh(connection)
-        else:
-            connection = existing
+        with trace.stage("load") as stage, session_scope(expire_on_commit=False) as db:
+            profile = db.query(Profile).filter(Profile.id == profile_id).first()
+            if not profile:
+                stage.outcome = "missing"
+                return
+
+            # Check if connection already exists and is connected
+            connection = db.query(Connection).filter(Connection.profile_id == profile_id).first()
+            if connection and connection.status == ConnectionStatus.CONNECTED:
+                # Already connected, no need to retry
+                stage.outcome = "already_connected"
+                return
+
+            # Create or update connection
+            if not connection:
+                connection = Connection(profile_id=profile_id)
+                db.add(connection)
             connection.status = ConnectionStatus.CONNECTING
-            db.commit()
+            db.flush()
+            connection_id = connection.id
+            trace.connection_id = connection_id
 
         # Scrape profile details for better personalization
         try:
-            profile_details = await linkedin_service.scrape_profile_details(profile.linkedin_url)
+            with trace.stage("scrape_profile_details"):
+                profile_details = await browser_executor.submit(
+                    "scrape_profile_details",
+                    linkedin_service.scrape_profile_details,
+                    profile.linkedin_url,
+                    priority=ActionPriority.BULK,
+                )
             # Update profile with scraped details if available
+            updates = {}
             if profile_details.get('headline') and not profile.title:
-                profile.title = profile_details.get('headline')
+                updates['title'] = profile_details.get('headline')
             if profile_details.get('current_company') and not profile.company:
-                profile.company = profile_details.get('current_company')
+                updates['company'] = profile_details.get('current_company')
             if profile_details.get('about') and not profile.notes:
-                profile.notes = profile_details.get('about')[:500]  # Limit length
-            db.commit()
+                updates['notes'] = profile_details.get('about')[:500]  # Limit length
+            if updates:
+                with session_scope() as db:
+                    db.query(Profile).filter(Profile.id == profile_id).update(updates, synchronize_session=False)
+                # Keep the detached copy in step for message generation
+                for field, value in updates.items():
+                    setattr(profile, field, value)
         except Exception as e:
             print(f"Error scraping profile details: {e}")
             # Continue with existing profile data
-        
+
         # Generate message
-        message_content = message_generator.generate_connection_message(profile)
+        with trace.stage("generate_connection_message"):
+            message_content = message_generator.generate_connection_message(profile)
 
         # Send connection request
-        await asyncio.sleep(settings.rate_limit_delay)
-        success, status_info = await linkedin_service.send_connection_request(profile.linkedin_url, message_content)
-
-        if success:
-            # Create message record
-            message = Message(
-                connection_id=connection.id,
-                content=message_content,
-                message_type=MessageType.INITIAL
+        with trace.stage("pacing"):
+            await asyncio.sleep(settings.rate_limit_delay)
+        with trace.stage("send_connection_request") as stage:
+            success, status_info = await browser_executor.submit(
+                "send_connection_request",
+                linkedin_service.send_connection_request,
+                profile.linkedin_url,
+                message_content,
+                priority=ActionPriority.BULK,
             )
-            db.add(message)
-            db.commit()
-            db.refresh(message)
-
-            connection.connection_message_id = message.id
-            connection.failure_reason = None  # Clear any previous failure reason
-            
-            # Differentiate between connection sent (PENDING) and already connected (CONNECTED)
-            if status_info == "already_connected":
-                # Already connected - can send messages
-                connection.status = ConnectionStatus.CONNECTED
-                connection.connected_at = db.query(Message).filter(Message.id == message.id).first().sent_at
-            elif status_info == "pending":
-                # Connection request sent, waiting for acceptance
-                connection.status = ConnectionStatus.PENDING
-                # Don't set connected_at yet - wait for acceptance
+            stage.outcome = (status_info or "ok") if success else "failed"
+
+        with trace.stage("record_result"), session_scope() as db:
+            connection = db.query(Connection).filter(Connection.id == connection_id).first()
+            if success:
+                # Create message record
+                message = Message(
+                    connection_id=connection_id,
+                    content=message_content,
+                    message_type=MessageType.INITIAL
+                )
+                db.add(message)
+                db.flush()
+
+                connection.connection_message_id = message.id
+                record_successful_attempt(connection)  # Clear any previous failure reason and retry state
+
+                # Differentiate between connection sent (PENDING) and already connected (CONNECTED)
+                if status_info == "already_connected":
+                    # Already connected - can send messages
+                    connection.status = ConnectionStatus.CONNECTED
+                    connection.connected_at = func.now()
+                    became_connected = True
+                elif status_info == "pending":
+                    # Connection request sent, waiting for acceptance
+                    connection.status = ConnectionStatus.PENDING
+                    # Don't set connected_at yet - wait for acceptance
+                else:
+                    # Default to PENDING if status unclear
+                    connection.status = ConnectionStatus.PENDING
             else:
-                # Default to PENDING if status unclear
-                connection.status = ConnectionStatus.PENDING
-        else:
-            connection.status = ConnectionStatus.FAILED
-            connection.failure_reason = status_info or "Unknown error"
-
-        db.commit()
+                connection.status = ConnectionStatus.FAILED
+                record_failed_attempt(connection, status_info or "Unknown error")
+                retry_scheduled = connection.next_attempt_at is not None
     except Exception as e:
         print(f"Error processing connection for profile {profile_id}: {e}")
-        if 'connection' in locals():
-            connection.status = ConnectionStatus.FAILED
+        if connection_id is not None:
             error_msg = str(e)
             # Categorize the error
             if "login" in error_msg.lower():
-                connection.failure_reason = "Login/authentication failed"
+                failure_reason = "Login/authentication failed"
             elif "timeout" in error_msg.lower():
-                connection.failure_reason = "Network timeout"
+                failure_reason = "Network timeout"
             elif "profile" in error_msg.lower() and "not found" in error_msg.lower():
-                connection.failure_reason = "Profile not found or inaccessible"
+                failure_reason = "Profile not found or inaccessible"
             else:
-                connection.failure_reason = f"Error: {error_msg[:200]}"  # Limit length
-            db.commit()
+                failure_reason = f"Error: {error_msg[:200]}"  # Limit length
+            with session_scope() as db:
+                connection = db.query(Connection).filter(Connection.id == connection_id).first()
+                connection.status = ConnectionStatus.FAILED
+                record_failed_attempt(connection, failure_reason)
+                retry_scheduled = connection.next_attempt_at is not None
+            became_connected = False
     finally:
-        db.close()
+        trace.flush()
+
+    if became_connected:
+        # Schedule its follow-up now rather than on the next safety-net run
+        followup_scheduling_worker.notify()
+    if retry_scheduled:
+        connection_retry_worker.notify()
+
+
+async def process_connections(profile_ids: List[int]):
+    """Process connections sequentially to respect rate limits"""
+    for profile_id in profile_ids:
+        await process_connection(profile_id)
+        # Wait between each connection to respect rate limits
+        await asyncio.sleep(settings.rate_limit_delay)
+
+
+leader.register_task("process_connections", process_connections)
 
 
 @router.post("/start")
@@ -178,15 +239,8 @@ async def start_connections(
     if len(profiles) > remaining_slots:
         print(f"Limiting to {remaining_slots} profiles due to daily limit")
 
-    # Process connections sequentially in background to respect rate limits
-    async def process_all_connections():
-        for profile in profiles_to_process:
-            await process_connection(profile.id)
-            # Wait between each connection to respect rate limits
-            await asyncio.sleep(settings.rate_limit_delay)
-    
-    # Start processing in background
-    asyncio.create_task(process_all_connections())
+    # Process connections sequentially in background, on the worker that owns the browser
+    leader.dispatch("process_connections", profile_ids=[profile.id for profile in profiles_to_process])
 
     return {
         "message": f"Started connection process for {len(profiles_to_process)} profiles (rate limited to {settings.rate_limit_delay}s between requests)",
@@ -208,10 +262,11 @@ async def retry_connections(
     if request.connection_ids:
         connections = db.query(Connection).filter(Connection.id.in_(request.connection_ids)).all()
     else:
-        # Retry all failed connections
-        connections = db.query(Connection).filter(
-            Connection.status == ConnectionStatus.FAILED
-        ).all()
+        # Retry failed connections that can still succeed; permanent failures need an explicit id
+        connections = [
+            conn for conn in db.query(Connection).filter(Connection.status == ConnectionStatus.FAILED).all()
+            if is_transient_failure(conn.failure_reason)
+        ]
     
     if not connections:
         return {"message": "No connections to retry", "retried_count": 0}
@@ -229,13 +284,14 @@ async def retry_connections(
     if len(connections) > remaining_slots:
         print(f"Limiting retry to {remaining_slots} connections due to daily limit")
     
+    # Claim them from the automatic retry worker, so it can't send a second invitation in parallel
+    db.query(Connection).filter(Connection.id.in_([conn.id for conn in connections_to_retry])).update(
+        {Connection.next_attempt_at: None}, synchronize_session=False
+    )
+    db.commit()
+
     # Process retries sequentially
-    async def retry_all_connections():
-        for conn in connections_to_retry:
-            await process_connection(conn.profile_id)
-            await asyncio.sleep(settings.rate_limit_delay)
-    
-    asyncio.create_task(retry_all_connections())
+    leader.dispatch("process_connections", profile_ids=[conn.profile_id for conn in connections_to_retry])
     
     return {
         "message": f"Retrying {len(connections_to_retry)} connections",
@@ -283,7 +339,9 @@ def get_connections(
             created_at=conn.created_at.isoformat() if conn.created_at else None,
             connection_message=connection_message,
             connection_message_sent_at=connection_message_sent_at,
-            failure_reason=conn.failure_reason
+            failure_reason=conn.failure_reason,
+            attempt_count=conn.attempt_count or 0,
+            next_attempt_at=conn.next_attempt_at.isoformat() if conn.next_attempt_at else None
         ))
 
     return result
@@ -315,6 +373,8 @@ def get_connection(connection_id: int, db: Session = Depends(get_db)):
         created_at=connection.created_at.isoformat() if connection.created_at else None,
         connection_message=connection_message,
         connection_message_sent_at=connection_message_sent_at,
-        failure_reason=connection.failure_reason
+        failure_reason=connection.failure_reason,
+        attempt_count=connection.attempt_count or 0,
+        next_attempt_at=connection.next_attempt_at.isoformat() if connection.next_attempt_at else None
     )
 
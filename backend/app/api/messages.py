@@ -1,14 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
 import asyncio
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
 from datetime import datetime
-from app.database import get_db, SessionLocal
+from app.database import get_db, session_scope
 from app.models.connection import Connection, ConnectionStatus
 from app.models.message import Message, MessageType
 from app.models.followup import FollowUp, FollowUpStatus
 from app.services.linkedin import linkedin_service
+from app.services.browser_executor import browser_executor, ActionPriority
 from app.services.message_generator import message_generator
+from app.services.leader import leader
+from app.services.stage_timer import StageTrace
 from app.config import settings
 from pydantic import BaseModel
 
@@ -34,68 +37,74 @@ class SendFollowUpRequest(BaseModel):
 
 
 async def send_followup_message(connection_id: int):
-    """Background task to send a follow-up message"""
-    db = SessionLocal()
+    """Background task to send a follow-up message, holding a session only around reads and writes"""
+    trace = StageTrace("followup", connection_id=connection_id)
     try:
-        connection = db.query(Connection).filter(Connection.id == connection_id).first()
-        if not connection:
-            return
-
-        if connection.status != ConnectionStatus.CONNECTED:
-            return
-
-        # Get previous messages
-        previous_messages = db.query(Message).filter(
-            Message.connection_id == connection_id
-        ).order_by(Message.sent_at).all()
+        with trace.stage("load"), session_scope(expire_on_commit=False) as db:
+            connection = db.query(Connection).options(selectinload(Connection.profile)).filter(
+                Connection.id == connection_id
+            ).first()
+            if not connection:
+                return
+
+            if connection.status != ConnectionStatus.CONNECTED:
+                return
+
+            # Get previous messages
+            previous_messages = db.query(Message).filter(
+                Message.connection_id == connection_id
+            ).order_by(Message.sent_at).all()
+            profile = connection.profile
+            initial_message_id = connection.connection_message_id
 
         # Generate follow-up message
-        message_content = message_generator.generate_followup_message(
-            connection.profile,
-            previous_messages
-        )
+        with trace.stage("generate_followup_message"):
+            message_content = message_generator.generate_followup_message(
+                profile,
+                previous_messages
+            )
 
         # Send message
-        import asyncio
-        await asyncio.sleep(settings.rate_limit_delay)
-        success = await linkedin_service.send_message(
-            connection.profile.linkedin_url,
-            message_content
-        )
-
-        if success:
-            # Create message record
-            message = Message(
-                connection_id=connection_id,
-                content=message_content,
-                message_type=MessageType.FOLLOWUP
+        with trace.stage("pacing"):
+            await asyncio.sleep(settings.rate_limit_delay)
+        with trace.stage("send_message") as stage:
+            success = await browser_executor.submit(
+                "send_message",
+                linkedin_service.send_message,
+                profile.linkedin_url,
+                message_content,
+                priority=ActionPriority.INTERACTIVE,
             )
-            db.add(message)
-            db.commit()
-
-            # Update follow-up status if exists
-            followup = db.query(FollowUp).filter(
-                FollowUp.message_id == connection.connection_message_id
-            ).filter(FollowUp.status == FollowUpStatus.PENDING).first()
-            
-            if followup:
-                followup.status = FollowUpStatus.SENT
-                followup.sent_at = datetime.utcnow()
-                db.commit()
-        else:
-            # Mark follow-up as failed
-            followup = db.query(FollowUp).filter(
-                FollowUp.message_id == connection.connection_message_id
-            ).filter(FollowUp.status == FollowUpStatus.PENDING).first()
-            
-            if followup:
-                followup.status = FollowUpStatus.FAILED
-                db.commit()
+            stage.outcome = "ok" if success else "failed"
+
+        with trace.stage("record_result"), session_scope() as db:
+            pending_followup = db.query(FollowUp).filter(
+                FollowUp.message_id == initial_message_id,
+                FollowUp.status == FollowUpStatus.PENDING
+            )
+            if success:
+                # Create message record
+                db.add(Message(
+                    connection_id=connection_id,
+                    content=message_content,
+                    message_type=MessageType.FOLLOWUP
+                ))
+                # Update follow-up status if exists
+                pending_followup.update(
+                    {FollowUp.status: FollowUpStatus.SENT, FollowUp.sent_at: datetime.utcnow()},
+                    synchronize_session=False
+                )
+            else:
+                # Mark follow-up as failed
+                pending_followup.update({FollowUp.status: FollowUpStatus.FAILED}, synchronize_session=False)
 
     except Exception as e:
         print(f"Error sending follow-up for connection {connection_id}: {e}")
     finally:
-        db.close()
+        trace.flush()
+
+
+leader.register_task("send_followup_message", send_followup_message)
 
 
 @router.get("", response_model=List[MessageResponse])
@@ -149,7 +158,7 @@ async def send_followup(
     if connection.status != ConnectionStatus.CONNECTED:
         raise HTTPException(status_code=400, detail="Connection must be connected to send follow-up")
 
-    asyncio.create_task(send_followup_message(request.connection_id))
+    leader.dispatch("send_followup_message", connection_id=request.connection_id)
 
     return {"message": "Follow-up message queued"}
 
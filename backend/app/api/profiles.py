@@ -1,12 +1,13 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import pandas as pd
 import io
+from app.config import settings
 from app.database import get_db
 from app.models.profile import Profile
 from app.models.connection import Connection
-from app.services.linkedin import linkedin_service
+from app.models.scrape_job import ScrapeJob, ScrapeJobStatus
+from app.services.scrape_jobs import start_scrape_job
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -32,12 +33,28 @@ class ScrapeSearchRequest(BaseModel):
     max_results: int = 50
 
 
+class ScrapeJobResponse(BaseModel):
+    id: int
+    search_url: str
+    max_results: int
+    status: str
+    next_page: int
+    profiles_found: int
+    profiles_created: int
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
 @router.post("/upload")
 async def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)):
     """Upload and parse CSV file"""
     if not file.filename.endswith('.csv'):
         raise HTTPException(status_code=400, detail="File must be a CSV")
 
+    # pandas is only needed here; importing it lazily keeps it out of API-only workers
+    import pandas as pd
+
     contents = await file.read()
     try:
         df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
@@ -255,77 +272,94 @@ def get_profile(profile_id: int, db: Session = Depends(get_db)):
     )
 
 
-@router.post("/scrape")
+@router.post("/scrape", status_code=202)
 async def scrape_linkedin_search(
     request: ScrapeSearchRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
-    """Scrape LinkedIn search results and create profiles"""
+    """Start a background job that scrapes LinkedIn search results into profiles"""
     # Validate URL
-    if not request.search_url or 'linkedin.com/search' not in request.search_url:
+    search_prefix = f"{settings.linkedin_base_url.rstrip('/')}/search"
+    if not request.search_url or (
+        'linkedin.com/search' not in request.search_url and not request.search_url.startswith(search_prefix)
+    ):
         raise HTTPException(status_code=400, detail="Invalid LinkedIn search URL")
     
     if request.max_results < 1 or request.max_results > 100:
         raise HTTPException(status_code=400, detail="max_results must be between 1 and 100")
-    
-    try:
-        # Scrape profiles from search results
-        scraped_profiles = await linkedin_service.scrape_search_results(
-            request.search_url,
-            max_results=request.max_results
-        )
-        
-        if not scraped_profiles:
-            return {
-                "message": "No profiles found in search results",
-                "profiles_created": 0,
-                "errors": []
-            }
-        
-        profiles_created = 0
-        errors = []
-        
-        for profile_data in scraped_profiles:
-            try:
-                linkedin_url = profile_data.get('linkedin_url')
-                if not linkedin_url:
-                    continue
-                
-                # Normalize URL
-                if not linkedin_url.startswith('http'):
-                    linkedin_url = f"https://www.linkedin.com{linkedin_url}"
-                
-                # Check if profile already exists
-                existing = db.query(Profile).filter(Profile.linkedin_url == linkedin_url).first()
-                if existing:
-                    continue
-                
-                # Create new profile
-                profile = Profile(
-                    linkedin_url=linkedin_url,
-                    name=profile_data.get('name', 'Unknown'),
-                    company=profile_data.get('company'),
-                    title=profile_data.get('title'),
-                )
-                db.add(profile)
-                profiles_created += 1
-                
-            except Exception as e:
-                errors.append(f"Error creating profile {profile_data.get('name', 'Unknown')}: {str(e)}")
-                continue
-        
-        db.commit()
-        
-        return {
-            "message": f"Successfully scraped and imported {profiles_created} profiles",
-            "profiles_created": profiles_created,
-            "errors": errors
-        }
-        
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Error scraping LinkedIn search: {str(e)}")
+
+    job = ScrapeJob(
+        search_url=request.search_url,
+        max_results=request.max_results,
+        status=ScrapeJobStatus.QUEUED,
+        next_page=1,
+        profiles_found=0,
+        profiles_created=0,
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    start_scrape_job(job.id)
+
+    return {
+        "message": "Scrape job started",
+        "job_id": job.id,
+        "status": job.status.value,
+    }
+
+
+@router.get("/scrape/{job_id}", response_model=ScrapeJobResponse)
+def get_scrape_job(job_id: int, db: Session = Depends(get_db)):
+    """Get progress of a search scrape job"""
+    job = db.query(ScrapeJob).filter(ScrapeJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+    return _scrape_job_response(job)
+
+
+@router.post("/scrape/{job_id}/resume", response_model=ScrapeJobResponse)
+def resume_scrape_job(job_id: int, db: Session = Depends(get_db)):
+    """
+    Resume a failed search scrape job from its last saved page
+
+    Queued and running jobs are rejected: their runner is still writing the
+    cursor. Jobs interrupted by a shutdown are resumed when a worker becomes
+    leader.
+    """
+    job = db.query(ScrapeJob).filter(ScrapeJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Scrape job not found")
+    if job.status == ScrapeJobStatus.COMPLETED:
+        raise HTTPException(status_code=400, detail="Scrape job already completed")
+
+    # Only the request that moves the job out of FAILED starts a run
+    resumed = db.query(ScrapeJob).filter(
+        ScrapeJob.id == job_id,
+        ScrapeJob.status == ScrapeJobStatus.FAILED
+    ).update({ScrapeJob.status: ScrapeJobStatus.QUEUED}, synchronize_session=False)
+    db.commit()
+    if not resumed:
+        raise HTTPException(status_code=409, detail="Scrape job is already queued or running")
+    db.refresh(job)
+
+    start_scrape_job(job.id)
+    return _scrape_job_response(job)
+
+
+def _scrape_job_response(job: ScrapeJob) -> ScrapeJobResponse:
+    return ScrapeJobResponse(
+        id=job.id,
+        search_url=job.search_url,
+        max_results=job.max_results,
+        status=job.status.value,
+        next_page=job.next_page,
+        profiles_found=job.profiles_found,
+        profiles_created=job.profiles_created,
+        error=job.error,
+        created_at=job.created_at.isoformat() if job.created_at else None,
+        finished_at=job.finished_at.isoformat() if job.finished_at else None,
+    )
 
 
 
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import FileResponse
+from typing import List, Optional
+from app.services.leader import leader
+from app.services.profiling import arm, is_authorized, list_reports, report_path
+
+router = APIRouter()
+
+# Code paths that can be armed to profile their next run
+PROFILE_TARGETS = {
+    "process_connection",
+    "process_followups",
+    "schedule_followups",
+    "retry_connections",
+    "sync_acceptances",
+    "sync_inbox",
+}
+
+
+leader.register_task("arm_profiler", arm)
+
+
+def _require_token(token: Optional[str]):
+    if not is_authorized(token):
+        # Look the same as a missing route when profiling is off or the key is wrong
+        raise HTTPException(status_code=404, detail="Not Found")
+
+
+@router.post("/arm/{target}")
+def arm_profiler(target: str, x_profile: Optional[str] = Header(None)):
+    """Profile the next run of a scheduler job or process_connection on the leader worker"""
+    _require_token(x_profile)
+    if target not in PROFILE_TARGETS:
+        raise HTTPException(status_code=400, detail=f"Unknown target, expected one of: {', '.join(sorted(PROFILE_TARGETS))}")
+    leader.dispatch("arm_profiler", target=target)
+    return {"message": f"Next run of {target} will be profiled"}
+
+
+@router.get("/reports", response_model=List[str])
+def get_reports(x_profile: Optional[str] = Header(None)):
+    """List saved profile reports on this worker, newest first"""
+    _require_token(x_profile)
+    return list_reports()
+
+
+@router.get("/reports/{name}")
+def get_report(name: str, x_profile: Optional[str] = Header(None)):
+    """Download one saved profile report"""
+    _require_token(x_profile)
+    path = report_path(name)
+    if not path:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return FileResponse(path, media_type="text/html")
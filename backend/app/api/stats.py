@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func, case
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 from app.database import get_db
 from app.models.profile import Profile
 from app.models.connection import Connection, ConnectionStatus
 from app.models.message import Message, MessageType
+from app.models.inbound_message import InboundMessage
+from app.models.stage_timing import StageTiming
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -19,9 +23,33 @@ class StatsResponse(BaseModel):
     total_messages: int
     initial_messages: int
     followup_messages: int
+    replies_received: int
     response_rate: float
 
 
+class StageTimingSummary(BaseModel):
+    pipeline: str
+    stage: str
+    runs: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    avg_ms: float
+    max_ms: float
+
+
+# Stage outcomes counted as errors in the summary
+ERROR_OUTCOMES = ("error", "failed")
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """Linear-interpolated percentile, matching Postgres percentile_cont"""
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
 @router.get("", response_model=StatsResponse)
 def get_stats(db: Session = Depends(get_db)):
     """Get dashboard statistics"""
@@ -52,19 +80,15 @@ def get_stats(db: Session = Depends(get_db)):
             Message.message_type == MessageType.FOLLOWUP
         ).count() or 0
         
-        # Calculate response rate (connections that received follow-ups / total connected)
-        # This is a simple metric - you might want to enhance it
+        # Connections that replied, as captured by the inbox sync
+        replies_received = db.query(func.count(func.distinct(InboundMessage.connection_id))).filter(
+            InboundMessage.connection_id.isnot(None)
+        ).scalar() or 0
+
+        # Calculate response rate (connections that replied / total connected)
         response_rate = 0.0
-        try:
-            if connections_connected > 0:
-                connections_with_followups = db.query(Connection).join(Message).filter(
-                    Connection.status == ConnectionStatus.CONNECTED,
-                    Message.message_type == MessageType.FOLLOWUP
-                ).distinct().count() or 0
-                response_rate = float(connections_with_followups) / float(connections_connected) * 100.0
-        except Exception as e:
-            print(f"Error calculating response rate: {e}")
-            response_rate = 0.0
+        if connections_connected > 0:
+            response_rate = float(replies_received) / float(connections_connected) * 100.0
 
         return StatsResponse(
             total_profiles=int(total_profiles),
@@ -75,6 +99,7 @@ def get_stats(db: Session = Depends(get_db)):
             total_messages=int(total_messages),
             initial_messages=int(initial_messages),
             followup_messages=int(followup_messages),
+            replies_received=int(replies_received),
             response_rate=float(round(response_rate, 2))
         )
     except Exception as e:
@@ -91,9 +116,60 @@ def get_stats(db: Session = Depends(get_db)):
             total_messages=0,
             initial_messages=0,
             followup_messages=0,
+            replies_received=0,
             response_rate=0.0
         )
 
 
+@router.get("/stages", response_model=List[StageTimingSummary])
+def get_stage_timings(
+    hours: int = 24,
+    pipeline: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Aggregate p50/p95 duration per pipeline stage over the last `hours`, slowest p95 first"""
+    if hours < 1 or hours > 24 * 90:
+        raise HTTPException(status_code=400, detail="hours must be between 1 and 2160")
+
+    filters = [StageTiming.started_at >= datetime.utcnow() - timedelta(hours=hours)]
+    if pipeline:
+        filters.append(StageTiming.pipeline == pipeline)
 
+    if db.get_bind().dialect.name == "postgresql":
+        # Percentiles computed in the database, one row per stage
+        rows = db.query(
+            StageTiming.pipeline,
+            StageTiming.stage,
+            func.count(StageTiming.id),
+            func.sum(case((StageTiming.outcome.in_(ERROR_OUTCOMES), 1), else_=0)),
+            func.percentile_cont(0.5).within_group(StageTiming.duration_ms),
+            func.percentile_cont(0.95).within_group(StageTiming.duration_ms),
+            func.avg(StageTiming.duration_ms),
+            func.max(StageTiming.duration_ms),
+        ).filter(*filters).group_by(StageTiming.pipeline, StageTiming.stage).all()
+        summaries = [
+            StageTimingSummary(
+                pipeline=row[0], stage=row[1], runs=row[2], errors=int(row[3] or 0),
+                p50_ms=round(row[4], 1), p95_ms=round(row[5], 1), avg_ms=round(float(row[6]), 1), max_ms=round(row[7], 1)
+            )
+            for row in rows
+        ]
+    else:
+        durations: Dict[Tuple[str, str], List[float]] = {}
+        errors: Dict[Tuple[str, str], int] = {}
+        for row_pipeline, stage, outcome, duration_ms in db.query(
+            StageTiming.pipeline, StageTiming.stage, StageTiming.outcome, StageTiming.duration_ms
+        ).filter(*filters).all():
+            key = (row_pipeline, stage)
+            durations.setdefault(key, []).append(duration_ms)
+            errors[key] = errors.get(key, 0) + (1 if outcome in ERROR_OUTCOMES else 0)
+        summaries = []
+        for (row_pipeline, stage), values in durations.items():
+            values.sort()
+            summaries.append(StageTimingSummary(
+                pipeline=row_pipeline, stage=stage, runs=len(values), errors=errors[(row_pipeline, stage)],
+                p50_ms=round(_percentile(values, 0.5), 1), p95_ms=round(_percentile(values, 0.95), 1),
+                avg_ms=round(sum(values) / len(values), 1), max_ms=round(values[-1], 1)
+            ))
 
+    return sorted(summaries, key=lambda summary: summary.p95_ms, reverse=True)
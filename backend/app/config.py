@@ -4,19 +4,57 @@ from typing import Optional
 
 class Settings(BaseSettings):
     database_url: str
+    run_migrations_on_startup: bool = True  # Check the schema at boot and migrate when it is behind; turn off when `python -m app.migrate` runs as a release step
     mistral_api_key: Optional[str] = None
+    message_generator_backend: str = "mistral"  # "mistral", or "template" to write messages from the fallback templates without calling the API (load tests, demos)
     linkedin_email: Optional[str] = None
     linkedin_password: Optional[str] = None
+    linkedin_base_url: str = "https://www.linkedin.com"  # Origin the automation browser navigates to (a local stand-in for benchmarks)
     rate_limit_delay: int = 30  # seconds between actions (LinkedIn recommends 20-30s minimum)
     followup_days: int = 7  # days to wait before follow-up
     max_connections_per_day: int = 20  # Maximum connection requests per day to avoid rate limiting
     retry_delay_base: int = 60  # Base delay for retries (seconds)
     max_retries: int = 3  # Maximum number of retries for failed actions
+    account_restricted_retry_delay: int = 21600  # Minimum delay before retrying after LinkedIn refused our account (403), in seconds
     secret_key: str = "your-secret-key-change-in-production"
     allowed_origins: str = "*"  # Comma-separated list of allowed origins, or "*" for all
     company_name: Optional[str] = None  # Your company name
     company_description: Optional[str] = None  # What your company does
     value_proposition: Optional[str] = None  # Your value proposition for personalizing messages
+    browser_block_resources: bool = True  # Abort non-essential requests in the automation browser
+    browser_blocked_resource_types: str = "image,media,font"  # Comma-separated Playwright resource types to abort
+    browser_allowed_domains: str = "linkedin.com,licdn.com"  # Comma-separated hosts allowed through; other hosts are aborted
+    session_check_ttl: int = 1800  # Seconds a confirmed LinkedIn login is trusted before reloading the feed to re-check it
+    browser_session_dir: str = ".cookies"  # Directory of the encrypted LinkedIn session file
+    browser_user_data_dir: Optional[str] = None  # Persistent Chromium profile directory, keeps HTTP cache and session across restarts
+    browser_prewarm: bool = True  # Launch the browser and load the feed in the background at startup
+    browser_recycle_after_navigations: int = 200  # Open a fresh browser context after this many navigations
+    browser_max_rss_mb: int = 1024  # Restart Chromium when its resident memory exceeds this (MB)
+    acceptance_sync_interval_minutes: int = 60  # How often to check LinkedIn for accepted invitations
+    acceptance_sync_max_pages: int = 10  # Max pages read from the sent-invitations and connections lists per sync
+    inbox_sync_interval_minutes: int = 60  # How often to read the messaging inbox for replies
+    inbox_sync_max_threads: int = 100  # Max inbox conversations loaded per sync
+    followup_batch_size: int = 20  # Due follow-ups claimed and loaded per batch
+    followup_claim_timeout_minutes: int = 30  # A claimed follow-up not finished after this can be claimed again
+    followup_max_sleep_minutes: int = 60  # Longest the follow-up dispatcher sleeps without a wakeup, for rows added by other processes
+    leader_election: bool = True  # On Postgres, only the worker holding an advisory lock runs the scheduler and browser
+    leader_lock_id: int = 7305419  # Advisory lock key shared by every worker of one deployment
+    leader_heartbeat_seconds: int = 10  # How often the leader checks its lock connection and followers try to take over
+    db_pool_size: int = 5  # Connections kept open per worker
+    db_max_overflow: int = 10  # Extra connections opened under load, closed when returned
+    db_pool_timeout: int = 30  # Seconds to wait for a free connection before failing the request
+    db_pool_recycle: int = 1800  # Reopen connections older than this (seconds), before the server drops them
+    db_pool_pre_ping: bool = True  # Test connections on checkout so dropped ones are replaced instead of erroring
+    db_query_inspector: bool = False  # Count queries per request, add X-DB-Queries/X-DB-Time headers and log N+1 and slow queries
+    db_slow_query_ms: int = 200  # Queries slower than this are logged by the query inspector
+    db_n_plus_one_threshold: int = 5  # Same statement shape repeated this often in one request is reported as N+1
+    profiling_enabled: bool = False  # Allow on-demand pyinstrument profiles, triggered with profiling_token
+    profiling_token: Optional[str] = None  # X-Profile header value that triggers a profile; profiling stays off until set
+    profiling_interval: float = 0.001  # Sampling interval of the profiler (seconds)
+    profiling_output_dir: str = "profiles"  # Where profile reports are saved
+    response_cache_enabled: bool = True  # Cache /api/stats, /api/profiles and /api/connections responses, validated against a data version
+    response_cache_ttl: float = 10.0  # Seconds a cached response is reused while the data version is unchanged
+    response_cache_max_entries: int = 256  # Cached responses kept per worker (least recently used are evicted)
     
     class Config:
         env_file = ".env"
@@ -1,9 +1,100 @@
-from sqlalchemy import create_engine
+import time
+from contextlib import contextmanager
+from typing import Iterator
+from sqlalchemy import create_engine, event, func
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.config import settings
+from app.services.metrics import registry
+
+pool_checkout_wait = registry.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the database pool",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+pool_checkout_timeouts = registry.counter(
+    "db_pool_checkout_timeouts_total",
+    "Pool checkouts that gave up after db_pool_timeout",
+)
+query_duration = registry.histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time, by statement type",
+    ("operation",),
+)
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            pool_checkout_timeouts.inc()
+            raise
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - start)
+
+
+def _engine_options() -> dict:
+    """Pool settings for server databases; SQLite keeps SQLAlchemy's own defaults"""
+    if settings.database_url.startswith("sqlite"):
+        return {}
+    return {
+        "poolclass": TimedQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+engine = create_engine(settings.database_url, **_engine_options())
+
+
+def _pool_stat(name: str):
+    """Read a QueuePool statistic at render time, or skip it for other pool classes"""
+    def read():
+        pool = engine.pool
+        return getattr(pool, name)() if isinstance(pool, QueuePool) else None
+    return read
+
+
+def _pool_utilization():
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return None
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    return pool.checkedout() / capacity if capacity else None
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _observe_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "OTHER"
+    if operation not in ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH"):
+        operation = "OTHER"
+    query_duration.observe(elapsed, operation=operation)
+
+
+registry.gauge("db_pool_size", "Connections the pool keeps open").set_function(_pool_stat("size"))
+registry.gauge("db_pool_checked_out", "Pool connections currently in use").set_function(_pool_stat("checkedout"))
+registry.gauge("db_pool_checked_in", "Idle connections in the pool").set_function(_pool_stat("checkedin"))
+registry.gauge("db_pool_overflow", "Connections open beyond pool_size").set_function(_pool_stat("overflow"))
+registry.gauge(
+    "db_pool_utilization_ratio",
+    "Checked-out connections over pool_size plus max_overflow",
+).set_function(_pool_utilization)
 
-engine = create_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -17,5 +108,85 @@ def get_db():
         db.close()
 
 
+@contextmanager
+def session_scope(**session_options) -> Iterator[Session]:
+    """
+    Unit of work for one burst of reads and writes
+
+    Commits when the block exits normally, rolls back on error and always
+    returns the connection to the pool. Background pipelines open one scope
+    per burst instead of holding a session across browser or LLM waits;
+    pass expire_on_commit=False to keep using loaded objects afterwards.
+    """
+    db = SessionLocal(**session_options)
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _dialect_insert(db, model):
+    """Get an INSERT construct that supports ON CONFLICT for the session's database"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"ON CONFLICT inserts are not supported on {dialect}")
+    return insert(model)
+
+
+def insert_ignore_conflicts(db, model, rows: list, index_elements: list) -> int:
+    """
+    Bulk insert rows in one statement, skipping rows that hit a unique index
+
+    Returns the number of rows actually inserted. The caller commits.
+    """
+    if not rows:
+        return 0
+    stmt = _dialect_insert(db, model).values(rows).on_conflict_do_nothing(index_elements=index_elements)
+    return db.execute(stmt).rowcount
+
+
+def insert_from_select_ignore_conflicts(db, model, columns: list, select_stmt, index_elements: list) -> int:
+    """
+    Run INSERT INTO model (columns) SELECT ... in one statement, skipping rows that hit a unique index
+
+    Returns the number of rows inserted. The caller commits.
+    """
+    stmt = _dialect_insert(db, model).from_select(columns, select_stmt).on_conflict_do_nothing(
+        index_elements=index_elements
+    )
+    return db.execute(stmt).rowcount
+
+
+def upsert(db, model, rows: list, index_elements: list, update_columns: list, where=None) -> int:
+    """
+    Bulk insert rows in one statement, updating update_columns on conflict
+
+    where, if given, is called with the excluded (incoming) row and returns
+    the condition under which an existing row is updated. Returns the number
+    of rows inserted or updated. The caller commits.
+    """
+    if not rows:
+        return 0
+    stmt = _dialect_insert(db, model).values(rows)
+    set_ = {column: getattr(stmt.excluded, column) for column in update_columns}
+    if hasattr(model, 'updated_at'):
+        # onupdate defaults are not applied to ON CONFLICT updates
+        set_['updated_at'] = func.now()
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_=set_,
+        where=where(stmt.excluded) if where is not None else None,
+    )
+    return db.execute(stmt).rowcount
+
+
 
 
@@ -3,17 +3,33 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.database import engine, Base
 from app.api import profiles, connections, messages, stats
 from app.api import settings as settings_api
-from app.services.scheduler import start_scheduler
+from app.api import metrics as metrics_api
+from app.api import profiling as profiling_api
+from app.middleware.request_metrics import RequestMetricsMiddleware
+from app.middleware.query_inspector import QueryInspectorMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.response_cache import ResponseCacheMiddleware
+from app.services.scheduler import start_scheduler, stop_scheduler
+from app.services.linkedin import linkedin_service
+from app.services.browser_executor import browser_executor, ActionPriority
+from app.services.scrape_jobs import resume_interrupted_scrape_jobs
+from app.services.leader import leader
+from app.migrate import migrate_if_needed
 # Import models to ensure they're registered with SQLAlchemy
-from app.models import Profile, Connection, Message, FollowUp, AppSettings
+from app.models import Profile, Connection, Message, FollowUp, AppSettings, ScrapeJob, InboundMessage, StageTiming
 
 app = FastAPI(title="LinkedIn Prospection Agent API", version="1.0.0")
 
 # CORS middleware
 from app.config import settings
+import asyncio
 import os
 import re
 
+# Dashboard response cache; added before CORS so CORS wraps it and sets headers per request origin
+if settings.response_cache_enabled:
+    app.add_middleware(ResponseCacheMiddleware)
+
 # Parse allowed origins from environment variable
 # When allow_credentials=True, we cannot use ["*"], so we need explicit origins
 if settings.allowed_origins == "*":
@@ -61,79 +77,50 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency per router, exported at /metrics
+app.add_middleware(RequestMetricsMiddleware)
+
+# Opt-in per-request query counting and N+1 detection
+if settings.db_query_inspector:
+    app.add_middleware(QueryInspectorMiddleware)
+
+# On-demand request profiles, guarded by profiling_token
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
 # Include routers
 app.include_router(profiles.router, prefix="/api/profiles", tags=["profiles"])
 app.include_router(connections.router, prefix="/api/connections", tags=["connections"])
 app.include_router(messages.router, prefix="/api/messages", tags=["messages"])
 app.include_router(stats.router, prefix="/api/stats", tags=["stats"])
 app.include_router(settings_api.router, prefix="/api/settings", tags=["settings"])
+app.include_router(metrics_api.router, prefix="/metrics", tags=["metrics"])
+app.include_router(profiling_api.router, prefix="/api/profiling", tags=["profiling"])
 
 
 @app.on_event("startup")
 async def startup_event():
-    """Run migrations and start scheduler on application startup"""
-    # Run Alembic migrations
-    from alembic.config import Config
-    from alembic import command
-    import os
-    from sqlalchemy import inspect
-    
-    try:
-        # Check if alembic_version table exists
-        inspector = inspect(engine)
-        tables = inspector.get_table_names()
-        
-        # Get the path to alembic.ini
-        alembic_ini_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "alembic.ini")
-        if not os.path.exists(alembic_ini_path):
-            alembic_ini_path = "alembic.ini"
-        
-        alembic_cfg = Config(alembic_ini_path)
-        
-        # If tables exist but alembic_version doesn't, we need to stamp the database
-        if 'profiles' in tables and 'alembic_version' not in tables:
-            print("Database tables exist but alembic_version table is missing. Stamping database...")
-            # Check if failure_reason column exists
-            if 'connections' in tables:
-                try:
-                    columns = [col['name'] for col in inspector.get_columns('connections')]
-                    if 'failure_reason' in columns:
-                        # All migrations are applied, stamp as head
-                        command.stamp(alembic_cfg, "head")
-                        print("Stamped database as head (all migrations already applied)")
-                    else:
-                        # Stamp as initial, then run the failure_reason migration
-                        command.stamp(alembic_cfg, "001_initial")
-                        command.upgrade(alembic_cfg, "head")
-                        print("Stamped database as 001_initial and ran remaining migrations")
-                except Exception as e:
-                    print(f"Warning: Could not check columns: {e}")
-                    # Just stamp as initial
-                    command.stamp(alembic_cfg, "001_initial")
-                    print("Stamped database as 001_initial")
-            else:
-                # No connections table, stamp as initial
-                command.stamp(alembic_cfg, "001_initial")
-                print("Stamped database as 001_initial")
-        elif 'alembic_version' in tables:
-            # Normal migration path
-            command.upgrade(alembic_cfg, "head")
-            print("Database migrations completed successfully")
-        else:
-            # No tables exist, run migrations normally
-            command.upgrade(alembic_cfg, "head")
-            print("Database migrations completed successfully")
-    except Exception as e:
-        print(f"Warning: Could not run migrations: {e}")
-        import traceback
-        traceback.print_exc()
-        # Fallback: ensure tables exist using create_all (won't recreate existing tables)
-        try:
-            Base.metadata.create_all(bind=engine)
-            print("Fallback: Ensured tables exist using create_all")
-        except Exception as e2:
-            print(f"Error: Could not ensure tables exist: {e2}")
-    
+    """Bring the schema to head and join the leader election on application startup"""
+    # With run_migrations_on_startup off, `python -m app.migrate` runs as a release step instead
+    if settings.run_migrations_on_startup:
+        migrate_if_needed()
+
+    # Only the elected worker runs the scheduler and the browser
+    leader.start()
+
+
+# Background startup tasks, referenced until they finish so they aren't garbage-collected
+startup_tasks = set()
+
+
+def _finish_warm_up(task: asyncio.Task):
+    startup_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Warning: Could not pre-warm the browser: {task.exception()}")
+
+
+async def become_leader():
+    """Start the work only one worker may do: scheduler, scrape jobs and the browser"""
     # Start scheduler
     try:
         start_scheduler()
@@ -141,6 +128,40 @@ async def startup_event():
         print(f"Warning: Could not start scheduler: {e}")
         # Continue even if scheduler fails to start
 
+    # Pick up search scrapes interrupted by the last shutdown
+    try:
+        resume_interrupted_scrape_jobs()
+    except Exception as e:
+        print(f"Warning: Could not resume scrape jobs: {e}")
+
+    # Launch the browser in the background so the first action starts hot
+    if settings.browser_prewarm:
+        task = asyncio.create_task(
+            browser_executor.submit("warm_up", linkedin_service.warm_up, priority=ActionPriority.INTERACTIVE)
+        )
+        startup_tasks.add(task)
+        task.add_done_callback(_finish_warm_up)
+
+
+async def step_down():
+    """Stop the scheduler and the browser so the new leader owns them alone"""
+    try:
+        stop_scheduler()
+    except Exception as e:
+        print(f"Warning: Could not stop scheduler: {e}")
+    await linkedin_service.close()
+
+
+leader.on_promote(become_leader)
+leader.on_demote(step_down)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Hand over leadership and close the automation browser and its Playwright driver"""
+    await leader.stop()
+    await linkedin_service.close()
+
 
 @app.get("/")
 async def root():
@@ -149,6 +170,6 @@ async def root():
 
 @app.get("/health")
 async def health():
-    return {"status": "healthy"}
+    return {"status": "healthy", "leader": leader.is_leader}
 
 
@@ -0,0 +1,71 @@
+from urllib.parse import parse_qs
+from app.services.profiling import is_authorized, start_profiler, save_report
+
+
+class ProfilingMiddleware:
+    """
+    Profile a single request on demand
+
+    A request carrying profiling_token in an X-Profile header runs under
+    pyinstrument. The token is never read from the query string, where it
+    would end up in access logs and browser history. With
+    X-Profile-Output: html (or profile_output=html) the call tree replaces
+    the response; otherwise the response is returned as usual, the report is
+    saved and its name is sent in X-Profile-Report.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {name.decode().lower(): value.decode() for name, value in scope.get("headers", [])}
+        if not is_authorized(headers.get("x-profile")):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = start_profiler()
+        if profiler is None:
+            await self.app(scope, receive, send)
+            return
+
+        query = parse_qs(scope.get("query_string", b"").decode())
+        output = headers.get("x-profile-output") or query.get("profile_output", ["store"])[0]
+        label = f"{scope['method']}_{scope['path']}"
+
+        if output == "html":
+            # Run the request to completion, then answer with the report instead
+            async def discard(message):
+                pass
+
+            try:
+                await self.app(scope, receive, discard)
+            finally:
+                profiler.stop()
+            body = profiler.output_html().encode()
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/html; charset=utf-8"), (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        # The report name must be in the headers, so they wait until the request finishes
+        messages = []
+
+        async def buffer(message):
+            messages.append(message)
+
+        try:
+            await self.app(scope, receive, buffer)
+        finally:
+            profiler.stop()
+        report = save_report(profiler, label)
+        for message in messages:
+            if message["type"] == "http.response.start":
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"x-profile-report", report.encode())])
+            await send(message)
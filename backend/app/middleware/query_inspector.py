@@ -0,0 +1,99 @@
+import re
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+from sqlalchemy import event
+from app.config import settings
+from app.database import engine
+
+
+class RequestQueryStats:
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.shapes: Dict[str, int] = {}
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+# Bound parameters and literals, so statements differing only in values share a shape
+_PLACEHOLDERS = re.compile(r"%\(\w+\)s|\?|(?<!:):\w+|\$\d+|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_VALUE_LISTS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalise a statement so repeated queries with different values compare equal"""
+    shape = _PLACEHOLDERS.sub("?", statement)
+    shape = _VALUE_LISTS.sub("(?)", shape)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+def redact_parameters(parameters) -> str:
+    """Describe bound parameters without their values"""
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{key}=?" for key in parameters) + "}"
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f"[{len(parameters)} parameter sets]"
+        return f"({len(parameters)} values)"
+    return "?"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("inspector_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None or not conn.info.get("inspector_start_time"):
+        return
+    elapsed = time.perf_counter() - conn.info["inspector_start_time"].pop()
+    stats.queries += 1
+    stats.seconds += elapsed
+    shape = statement_shape(statement)
+    stats.shapes[shape] = stats.shapes.get(shape, 0) + 1
+    if elapsed * 1000 >= settings.db_slow_query_ms:
+        print(f"Slow query ({elapsed * 1000:.1f} ms): {_WHITESPACE.sub(' ', statement).strip()[:500]} params={redact_parameters(parameters)}")
+
+
+class QueryInspectorMiddleware:
+    """
+    Count queries and DB time per request and flag N+1 patterns
+
+    Opt-in through db_query_inspector. Adds X-DB-Queries and X-DB-Time (ms)
+    response headers, logs statements slower than db_slow_query_ms with their
+    parameters redacted, and warns when one statement shape repeats at least
+    db_n_plus_one_threshold times in a request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.queries).encode()))
+                headers.append((b"x-db-time", f"{stats.seconds * 1000:.1f}".encode()))
+                message = dict(message, headers=headers)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current.reset(token)
+            for shape, count in stats.shapes.items():
+                if count >= settings.db_n_plus_one_threshold:
+                    print(f"Possible N+1 in {scope['method']} {scope['path']}: {count}x {shape[:300]}")
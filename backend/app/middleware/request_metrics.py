@@ -0,0 +1,52 @@
+import time
+from app.services.metrics import registry
+
+
+request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "API request latency, by router, method and status code",
+    ("router", "method", "status"),
+)
+
+# Routers mounted under /api/<name>; anything else is grouped to keep label cardinality bounded
+API_ROUTERS = {"profiles", "connections", "messages", "stats", "settings"}
+TOP_LEVEL_PATHS = {"/": "root", "/health": "health", "/metrics": "metrics"}
+
+
+def router_label(path: str) -> str:
+    """Map a request path to the router that serves it"""
+    parts = path.split("/")
+    if len(parts) > 2 and parts[1] == "api" and parts[2] in API_ROUTERS:
+        return parts[2]
+    return TOP_LEVEL_PATHS.get(path.rstrip("/") or "/", "other")
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording the latency of every HTTP request per router"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_duration.observe(
+                time.perf_counter() - start,
+                router=router_label(scope["path"]),
+                method=scope["method"],
+                status=str(status),
+            )
@@ -0,0 +1,179 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+from sqlalchemy import func, select
+from starlette.concurrency import run_in_threadpool
+from app.config import settings
+from app.database import engine
+from app.models import Profile, Connection, Message, InboundMessage
+from app.services.metrics import registry
+
+
+cache_requests = registry.counter(
+    "http_response_cache_requests_total",
+    "Requests to cached dashboard endpoints, by route and result (hit, miss, coalesced, not_modified)",
+    ("route", "result"),
+)
+
+# Dashboard GET routes and the tables their responses are built from
+CACHED_ROUTES = {
+    "/api/stats": (Profile, Connection, Message, InboundMessage),
+    "/api/profiles": (Profile, Connection),
+    "/api/connections": (Profile, Connection, Message),
+}
+
+
+def data_version(models) -> tuple:
+    """
+    A marker that changes whenever rows of these tables are inserted or updated
+
+    max(id) moves on inserts and max(updated_at) on updates (messages are
+    insert-only; nothing is deleted). Both are index lookups, fetched in one
+    query however many tables there are.
+    """
+    columns = []
+    for model in models:
+        columns.append(select(func.max(model.id)).scalar_subquery())
+        if hasattr(model, "updated_at"):
+            columns.append(select(func.max(model.updated_at)).scalar_subquery())
+    with engine.connect() as connection:
+        return tuple(connection.execute(select(*columns)).one())
+
+
+def cache_key(scope) -> str:
+    """Route plus query string, with parameters sorted so their order doesn't matter"""
+    query = sorted(parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True))
+    return f"{scope['path'].rstrip('/')}?{urlencode(query)}"
+
+
+class CachedResponse:
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes, version: tuple):
+        self.status = status
+        self.headers = [(name, value) for name, value in headers if name.lower() != b"content-length"]
+        self.body = body
+        self.version = version
+        self.etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+        self.created = time.monotonic()
+
+    def is_fresh(self, version: tuple) -> bool:
+        return self.version == version and time.monotonic() - self.created < settings.response_cache_ttl
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCacheMiddleware:
+    """
+    Serve the polled dashboard endpoints from a short-lived in-process cache
+
+    Entries are keyed on route plus query and tagged with the data version of
+    the tables the route reads. A request first fetches the current version
+    (one cheap query); an entry with that version younger than
+    response_cache_ttl is replayed without running the endpoint. The TTL also
+    bounds staleness for writes the marker can miss, such as a transaction
+    that commits after a later one with an older now(). Identical requests
+    arriving while an entry is being computed wait for that computation
+    instead of repeating it. Responses carry an ETag of their body, and a
+    matching If-None-Match gets a 304.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._in_flight: Dict[Tuple[str, tuple], asyncio.Future] = {}
+
+    async def __call__(self, scope, receive, send):
+        models = CACHED_ROUTES.get(scope["path"].rstrip("/")) if scope["type"] == "http" else None
+        if models is None or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        route = scope["path"].rstrip("/")
+        try:
+            version = await run_in_threadpool(data_version, models)
+        except Exception as e:
+            print(f"Response cache bypassed, could not read the data version: {e}")
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope)
+        entry = self._entries.get(key)
+        if entry is not None and entry.is_fresh(version):
+            self._entries.move_to_end(key)
+            result = "hit"
+        else:
+            entry, result = await self._compute(key, version, scope, receive)
+            if entry is None:
+                # The shared computation failed or was cancelled: run the endpoint for this request
+                await self.app(scope, receive, send)
+                return
+
+        if_none_match = dict(scope["headers"]).get(b"if-none-match", b"").decode("latin-1")
+        if entry.status == 200 and _etag_matches(if_none_match, entry.etag):
+            cache_requests.inc(route=route, result="not_modified")
+            await self._send(send, entry, result, not_modified=True)
+        else:
+            cache_requests.inc(route=route, result=result)
+            await self._send(send, entry, result)
+
+    async def _compute(self, key: str, version: tuple, scope, receive) -> Tuple[Optional[CachedResponse], str]:
+        """
+        Run the endpoint once per key and version, sharing the response with concurrent requests
+
+        Only 200 responses are stored for later requests.
+        """
+        in_flight = self._in_flight.get((key, version))
+        if in_flight is not None:
+            return await asyncio.shield(in_flight), "coalesced"
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[(key, version)] = future
+        entry = None
+        try:
+            entry = await self._render(scope, receive, version)
+            if entry.status == 200:
+                self._store(key, entry)
+        finally:
+            self._in_flight.pop((key, version), None)
+            future.set_result(entry)
+        return entry, "miss"
+
+    async def _render(self, scope, receive, version: tuple) -> CachedResponse:
+        """Run the endpoint and capture its response"""
+        start: Dict = {}
+        chunks: List[bytes] = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+        return CachedResponse(start["status"], list(start.get("headers", [])), b"".join(chunks), version)
+
+    def _store(self, key: str, entry: CachedResponse):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > settings.response_cache_max_entries:
+            self._entries.popitem(last=False)
+
+    async def _send(self, send, entry: CachedResponse, result: str, not_modified: bool = False):
+        headers = [(b"x-cache", result.encode())]
+        if entry.status == 200:
+            # Browsers keep the body but revalidate on every poll, getting a 304 while nothing changed
+            headers += [(b"etag", entry.etag.encode()), (b"cache-control", b"no-cache")]
+        if not_modified:
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers = entry.headers + headers + [(b"content-length", str(len(entry.body)).encode())]
+        await send({"type": "http.response.start", "status": entry.status, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
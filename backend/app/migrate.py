@@ -0,0 +1,139 @@
+"""
+Bring the database schema to the bundled Alembic head
+
+Runs at startup (see app.main) and as a one-shot release command:
+
+    python -m app.migrate           # upgrade, stamping databases that predate Alembic
+    python -m app.migrate --check   # exit 1 if the database is behind the bundled head
+"""
+import argparse
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Optional, Set
+from sqlalchemy import text
+from app.database import engine, Base
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+VERSIONS_DIR = ALEMBIC_INI.parent / "alembic" / "versions"
+
+_REVISION = re.compile(r"^revision\s*=\s*['\"]([^'\"]+)['\"]", re.MULTILINE)
+_DOWN_REVISION = re.compile(r"^down_revision\s*=\s*(.+)$", re.MULTILINE)
+_QUOTED = re.compile(r"['\"]([^'\"]+)['\"]")
+
+
+def bundled_heads() -> Set[str]:
+    """Head revisions of the bundled migration scripts, read from their source without importing them"""
+    revisions: Set[str] = set()
+    parents: Set[str] = set()
+    for path in VERSIONS_DIR.glob("*.py"):
+        source = path.read_text()
+        revision = _REVISION.search(source)
+        if revision:
+            revisions.add(revision.group(1))
+        down_revision = _DOWN_REVISION.search(source)
+        if down_revision:
+            # A merge revision lists several parents in a tuple
+            parents.update(_QUOTED.findall(down_revision.group(1)))
+    return revisions - parents
+
+
+def current_revisions() -> Optional[Set[str]]:
+    """Revisions recorded in alembic_version, or None if the table does not exist yet"""
+    try:
+        with engine.connect() as connection:
+            return {row[0] for row in connection.execute(text("SELECT version_num FROM alembic_version"))}
+    except Exception:
+        return None
+
+
+def is_at_head() -> bool:
+    """One query: does alembic_version already match the bundled head?"""
+    current = current_revisions()
+    return bool(current) and current == bundled_heads()
+
+
+def run_migrations():
+    """Upgrade to head with Alembic, stamping databases created before it was introduced"""
+    from alembic.config import Config
+    from alembic import command
+    from sqlalchemy import inspect
+
+    try:
+        # Check if alembic_version table exists
+        inspector = inspect(engine)
+        tables = inspector.get_table_names()
+
+        alembic_ini_path = str(ALEMBIC_INI)
+        if not os.path.exists(alembic_ini_path):
+            alembic_ini_path = "alembic.ini"
+
+        alembic_cfg = Config(alembic_ini_path)
+
+        # If tables exist but alembic_version doesn't, we need to stamp the database
+        if 'profiles' in tables and 'alembic_version' not in tables:
+            print("Database tables exist but alembic_version table is missing. Stamping database...")
+            # Check if failure_reason column exists
+            if 'connections' in tables:
+                try:
+                    columns = [col['name'] for col in inspector.get_columns('connections')]
+                    if 'failure_reason' in columns:
+                        # Tables predate alembic but have failure_reason, run the later migrations
+                        command.stamp(alembic_cfg, "002_add_failure_reason")
+                        command.upgrade(alembic_cfg, "head")
+                        print("Stamped database as 002_add_failure_reason and ran remaining migrations")
+                    else:
+                        # Stamp as initial, then run the failure_reason migration
+                        command.stamp(alembic_cfg, "001_initial")
+                        command.upgrade(alembic_cfg, "head")
+                        print("Stamped database as 001_initial and ran remaining migrations")
+                except Exception as e:
+                    print(f"Warning: Could not check columns: {e}")
+                    # Just stamp as initial
+                    command.stamp(alembic_cfg, "001_initial")
+                    print("Stamped database as 001_initial")
+            else:
+                # No connections table, stamp as initial
+                command.stamp(alembic_cfg, "001_initial")
+                print("Stamped database as 001_initial")
+        else:
+            # Normal migration path, or no tables yet
+            command.upgrade(alembic_cfg, "head")
+            print("Database migrations completed successfully")
+    except Exception as e:
+        print(f"Warning: Could not run migrations: {e}")
+        import traceback
+        traceback.print_exc()
+        # Fallback: ensure tables exist using create_all (won't recreate existing tables)
+        try:
+            Base.metadata.create_all(bind=engine)
+            print("Fallback: Ensured tables exist using create_all")
+        except Exception as e2:
+            print(f"Error: Could not ensure tables exist: {e2}")
+
+
+def migrate_if_needed():
+    """Startup fast path: skip Alembic entirely when the schema is already at head"""
+    if is_at_head():
+        print("Database schema is at head, skipping migrations")
+        return
+    run_migrations()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bring the database schema to the bundled Alembic head")
+    parser.add_argument("--check", action="store_true", help="Only report whether the database is at head")
+    args = parser.parse_args()
+
+    if args.check:
+        current, heads = current_revisions(), bundled_heads()
+        print(f"Database: {sorted(current) if current else 'unversioned'}, bundled head: {sorted(heads)}")
+        sys.exit(0 if current == heads else 1)
+    run_migrations()
+    # run_migrations only warns on failure; a release step must fail loudly
+    sys.exit(0 if is_at_head() else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,12 @@ from app.models.connection import Connection
 from app.models.message import Message
 from app.models.followup import FollowUp
 from app.models.settings import AppSettings
+from app.models.scrape_job import ScrapeJob
+from app.models.inbound_message import InboundMessage
+from app.models.stage_timing import StageTiming
+from app.models.leader_task import LeaderTask
 
-__all__ = ["Profile", "Connection", "Message", "FollowUp", "AppSettings"]
+__all__ = ["Profile", "Connection", "Message", "FollowUp", "AppSettings", "ScrapeJob", "InboundMessage", "StageTiming", "LeaderTask"]
 
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -22,13 +22,20 @@ class Connection(Base):
     connected_at = Column(DateTime(timezone=True), nullable=True)
     connection_message_id = Column(Integer, ForeignKey("messages.id"), nullable=True)
     failure_reason = Column(String, nullable=True)  # Detailed reason for failure
+    attempt_count = Column(Integer, nullable=False, default=0, server_default="0")  # Failed attempts since the last success
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)  # When a transient failure is retried automatically
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)  # MAX(updated_at) feeds the response cache's data version
 
     profile = relationship("Profile", back_populates="connections")
     connection_message = relationship("Message", foreign_keys=[connection_message_id])
     messages = relationship("Message", back_populates="connection", foreign_keys="Message.connection_id")
 
+    __table_args__ = (
+        # Serves the automatic retry scan and its next-due MIN(next_attempt_at) lookup
+        Index("ix_connections_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
 
 
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -16,15 +16,21 @@ class FollowUp(Base):
     __tablename__ = "followups"
 
     id = Column(Integer, primary_key=True, index=True)
-    message_id = Column(Integer, ForeignKey("messages.id"), nullable=False)
+    message_id = Column(Integer, ForeignKey("messages.id"), nullable=False, unique=True, index=True)  # One follow-up per initial message
     scheduled_at = Column(DateTime(timezone=True), nullable=False)
     sent_at = Column(DateTime(timezone=True), nullable=True)
     status = Column(SQLEnum(FollowUpStatus), default=FollowUpStatus.PENDING, nullable=False)
+    claimed_at = Column(DateTime(timezone=True), nullable=True)  # Set while a scheduler run is sending it
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     message = relationship("Message")
 
+    __table_args__ = (
+        # Serves the scheduler's next-due MIN(scheduled_at) lookup and the due scan
+        Index("ix_followups_status_scheduled_at", "status", "scheduled_at"),
+    )
+
 
 
 
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class InboundMessage(Base):
+    __tablename__ = "inbound_messages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    thread_url = Column(String, unique=True, nullable=False, index=True)  # One row per LinkedIn conversation
+    profile_url = Column(String, nullable=True, index=True)
+    participant_name = Column(String, nullable=True)
+    connection_id = Column(Integer, ForeignKey("connections.id"), nullable=True, index=True)
+    snippet = Column(Text, nullable=True)  # Last inbound message as shown in the inbox list
+    last_inbound_at = Column(DateTime(timezone=True), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
+
+    connection = relationship("Connection")
+
+
+
+
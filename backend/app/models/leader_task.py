@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class LeaderTask(Base):
+    """A task a follower handed to the leader, kept until the leader claims it"""
+    __tablename__ = "leader_tasks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    task = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)  # JSON keyword arguments for the task's handler
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
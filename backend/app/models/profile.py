@@ -15,7 +15,7 @@ class Profile(Base):
     notes = Column(Text, nullable=True)
     tags = Column(String, nullable=True)  # Comma-separated tags
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), index=True)
 
     connections = relationship("Connection", back_populates="profile", cascade="all, delete-orphan")
 
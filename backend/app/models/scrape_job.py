@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, DateTime, Enum as SQLEnum
+from sqlalchemy.sql import func
+import enum
+from app.database import Base
+
+
+class ScrapeJobStatus(str, enum.Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class ScrapeJob(Base):
+    __tablename__ = "scrape_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    search_url = Column(String, nullable=False)
+    max_results = Column(Integer, nullable=False)
+    status = Column(SQLEnum(ScrapeJobStatus), default=ScrapeJobStatus.QUEUED, nullable=False)
+    next_page = Column(Integer, default=1, nullable=False)  # Resume cursor: next search results page to scrape
+    profiles_found = Column(Integer, default=0, nullable=False)
+    profiles_created = Column(Integer, default=0, nullable=False)
+    error = Column(String, nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+
+
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class StageTiming(Base):
+    """One timed stage of a pipeline run; rows are only ever inserted"""
+    __tablename__ = "stage_timings"
+
+    id = Column(Integer, primary_key=True, index=True)
+    pipeline = Column(String, nullable=False)  # "connection" or "followup"
+    run_id = Column(String, nullable=False, index=True)  # Groups the stages of one run
+    connection_id = Column(Integer, nullable=True, index=True)
+    followup_id = Column(Integer, nullable=True)
+    stage = Column(String, nullable=False)
+    outcome = Column(String, nullable=False)  # "ok", "error", or a stage-specific result such as "failed"
+    started_at = Column(DateTime(timezone=True), nullable=False)
+    finished_at = Column(DateTime(timezone=True), nullable=False)
+    duration_ms = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Serves the per-stage percentile aggregation over a time window
+        Index("ix_stage_timings_pipeline_stage_started_at", "pipeline", "stage", "started_at"),
+    )
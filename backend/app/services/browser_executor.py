@@ -0,0 +1,131 @@
+import asyncio
+import itertools
+import time
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Optional
+from app.services.metrics import registry
+
+
+action_queue_wait = registry.histogram(
+    "linkedin_action_queue_wait_seconds",
+    "Time browser actions waited for the shared page",
+    ("action",),
+)
+action_duration = registry.histogram(
+    "linkedin_action_duration_seconds",
+    "Time browser actions held the shared page",
+    ("action",),
+)
+action_results = registry.counter(
+    "linkedin_actions_total",
+    "Browser actions run by the executor, by outcome",
+    ("action", "outcome"),
+)
+action_queue_depth = registry.gauge(
+    "linkedin_action_queue_depth",
+    "Browser actions waiting for the shared page",
+)
+
+
+class ActionPriority(IntEnum):
+    INTERACTIVE = 0  # Triggered by someone waiting on the dashboard
+    SCHEDULED = 10  # Background jobs such as due follow-ups
+    BULK = 20  # Campaigns and search scrapes
+
+
+class BrowserActionExecutor:
+    """
+    Run LinkedIn browser actions one at a time, in priority order
+
+    Every caller shares linkedin_service.page, so concurrent navigations would
+    corrupt each other. Producers submit actions to a priority queue and a
+    single consumer task runs them; equal priorities run in submission order.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._sequence = itertools.count()
+        self.current_action: Optional[str] = None
+
+    def _ensure_worker(self):
+        """Start the consumer lazily, inside the running event loop"""
+        if self._queue is None:
+            self._queue = asyncio.PriorityQueue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(
+        self,
+        action: str,
+        function: Callable[..., Awaitable[Any]],
+        *args,
+        priority: ActionPriority = ActionPriority.SCHEDULED,
+        **kwargs,
+    ) -> Any:
+        """
+        Queue a browser action and wait for its result
+
+        Exceptions raised by the action are re-raised in the caller. If the
+        caller is cancelled before the action starts, the action is dropped.
+        """
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((priority, next(self._sequence), action, function, args, kwargs, future, time.perf_counter()))
+        action_queue_depth.set(self._queue.qsize())
+        return await future
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _run(self):
+        try:
+            while True:
+                await self._run_next()
+        finally:
+            # Only a cancelled worker (shutdown) or SystemExit/KeyboardInterrupt gets here
+            self._cancel_queued()
+
+    async def _run_next(self):
+        _, _, action, function, args, kwargs, future, enqueued_at = await self._queue.get()
+        action_queue_depth.set(self._queue.qsize())
+        if future.cancelled():
+            return
+
+        action_queue_wait.observe(time.perf_counter() - enqueued_at, action=action)
+        self.current_action = action
+        started = time.perf_counter()
+        try:
+            result = await function(*args, **kwargs)
+        except BaseException as e:
+            action_results.inc(action=action, outcome="error")
+            if isinstance(e, asyncio.CancelledError) and asyncio.current_task().cancelling():
+                # The worker itself is being cancelled: release the caller, then stop
+                future.cancel()
+                raise
+            if not future.done():
+                if isinstance(e, asyncio.CancelledError):
+                    # Raised inside the action; surface it as a failure, not as a cancel of the caller
+                    future.set_exception(RuntimeError(f"Browser action {action} was cancelled"))
+                else:
+                    future.set_exception(e)
+            if not isinstance(e, (Exception, asyncio.CancelledError)):
+                raise
+        else:
+            action_results.inc(action=action, outcome="ok")
+            if not future.done():
+                future.set_result(result)
+        finally:
+            action_duration.observe(time.perf_counter() - started, action=action)
+            self.current_action = None
+
+    def _cancel_queued(self):
+        """Release callers of actions that will never run"""
+        while not self._queue.empty():
+            future = self._queue.get_nowait()[6]
+            future.cancel()
+        action_queue_depth.set(0)
+
+
+# Global instance
+browser_executor = BrowserActionExecutor()
@@ -0,0 +1,141 @@
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+from app.config import settings
+from app.services.metrics import registry
+
+
+browser_rss_bytes = registry.gauge(
+    "linkedin_browser_rss_bytes",
+    "Resident memory of all Chromium processes started by this worker",
+)
+browser_navigations = registry.counter(
+    "linkedin_browser_navigations_total",
+    "Page navigations performed by the automation browser",
+)
+browser_navigations_since_recycle = registry.gauge(
+    "linkedin_browser_navigations_since_recycle",
+    "Navigations since the browser context was last recycled",
+)
+browser_recycles = registry.counter(
+    "linkedin_browser_recycles_total",
+    "Browser context recycles, by reason",
+    ("reason",),
+)
+browser_restarts = registry.counter(
+    "linkedin_browser_restarts_total",
+    "Full browser restarts, by reason",
+    ("reason",),
+)
+
+
+def chromium_rss_bytes(root_pid: Optional[int] = None) -> Optional[int]:
+    """
+    Sum the resident memory of the Chromium processes spawned under root_pid
+
+    Playwright starts a driver process which in turn starts Chromium, so the
+    whole process tree below this worker is walked via /proc. Returns None on
+    platforms without /proc.
+    """
+    proc = Path("/proc")
+    if not proc.is_dir():
+        return None
+
+    root_pid = root_pid or os.getpid()
+    children: Dict[int, List[int]] = {}
+    names: Dict[int, str] = {}
+    for entry in proc.iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # The command name is wrapped in parentheses and may contain spaces
+        name = stat[stat.index("(") + 1:stat.rindex(")")]
+        fields = stat[stat.rindex(")") + 2:].split()
+        pid = int(entry.name)
+        children.setdefault(int(fields[1]), []).append(pid)
+        names[pid] = name.lower()
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total = 0
+    pending = list(children.get(root_pid, []))
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, []))
+        if "chrom" not in names[pid] and "headless" not in names[pid]:
+            continue
+        try:
+            resident_pages = int((proc / str(pid) / "statm").read_text().split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        total += resident_pages * page_size
+    return total
+
+
+class BrowserLifecycleManager:
+    """
+    Track automation browser health and decide when to recycle it
+
+    LinkedInService reports navigations and crashes here and asks for a
+    recycle decision before each action; the actual Playwright work stays in
+    the service.
+    """
+
+    def __init__(self):
+        self.navigations_since_recycle = 0
+        self.crashed = False
+        self.crash_reason: Optional[str] = None
+        browser_rss_bytes.set_function(chromium_rss_bytes)
+        browser_navigations_since_recycle.set_function(lambda: self.navigations_since_recycle)
+
+    def record_navigation(self):
+        self.navigations_since_recycle += 1
+        browser_navigations.inc()
+
+    def record_crash(self, reason: str):
+        """Mark the browser as unusable so the next action restarts it"""
+        if not self.crashed:
+            print(f"Automation browser crashed: {reason}")
+        self.crashed = True
+        self.crash_reason = reason
+
+    def recycle_reason(self) -> Optional[str]:
+        """
+        Decide whether the browser must be recycled before the next action
+
+        Returns "crash" and "rss" when the whole browser must be restarted,
+        "navigations" when a fresh context is enough, or None.
+        """
+        if self.crashed:
+            return "crash"
+        rss = chromium_rss_bytes()
+        if rss is not None and rss > settings.browser_max_rss_mb * 1024 * 1024:
+            return "rss"
+        if self.navigations_since_recycle >= settings.browser_recycle_after_navigations:
+            return "navigations"
+        return None
+
+    def record_recycle(self, reason: str):
+        self.navigations_since_recycle = 0
+        browser_recycles.inc(reason=reason)
+
+    def record_launch(self):
+        """A new browser is up: clear the crash flag and the navigation count"""
+        self.navigations_since_recycle = 0
+        self.crashed = False
+        self.crash_reason = None
+
+    def record_restart(self, reason: str):
+        browser_restarts.inc(reason=reason)
+
+    def snapshot(self) -> dict:
+        """Current lifecycle stats, for logs and debugging"""
+        return {
+            'rss_bytes': chromium_rss_bytes(),
+            'navigations_since_recycle': self.navigations_since_recycle,
+            'total_navigations': int(browser_navigations.value()),
+            'crashed': self.crashed,
+            'crash_reason': self.crash_reason,
+        }
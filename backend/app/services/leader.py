@@ -0,0 +1,235 @@
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+from sqlalchemy import insert, text
+from app.database import engine
+from app.config import settings
+from app.models import LeaderTask
+from app.services.metrics import registry
+
+
+# Followers queue browser work in leader_tasks and wake the leader on this Postgres channel
+TASK_CHANNEL = "linkedin_leader_tasks"
+
+leader_gauge = registry.gauge(
+    "linkedin_worker_is_leader",
+    "1 when this worker owns the scheduler and the automation browser",
+)
+leader_changes = registry.counter(
+    "linkedin_leader_transitions_total",
+    "Times this worker gained or lost leadership",
+    ("transition",),
+)
+
+
+class LeaderElector:
+    """
+    Elect one worker to own the scheduler and the automation browser
+
+    Every worker keeps a dedicated Postgres connection and tries to take a
+    session-level advisory lock on it. The holder is the leader: it runs the
+    promotion callbacks (scheduler, browser) and runs the tasks followers
+    queue in leader_tasks instead of starting browser work themselves. A
+    NOTIFY wakes it for new tasks; since Postgres drops notifications nobody
+    is listening for, the table also carries tasks across failovers and the
+    new leader claims them when it is promoted. The lock
+    connection doubles as the heartbeat; when it dies Postgres releases the
+    lock and another worker takes over on its next attempt.
+
+    On databases without advisory locks (SQLite in development) there is only
+    ever one process, so it is the leader unconditionally.
+    """
+
+    def __init__(self):
+        self.is_leader = False
+        self._handlers: Dict[str, Callable[..., Awaitable[Any]]] = {}
+        self._on_promote: List[Callable[[], Awaitable[None]]] = []
+        self._on_demote: List[Callable[[], Awaitable[None]]] = []
+        self._connection = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        # Running task handlers, referenced until they finish so they aren't garbage-collected
+        self._running: Set[asyncio.Task] = set()
+        leader_gauge.set_function(lambda: 1 if self.is_leader else 0)
+
+    def register_task(self, name: str, handler: Callable[..., Awaitable[Any]]):
+        """Make handler runnable on the leader via dispatch(name, ...)"""
+        self._handlers[name] = handler
+
+    def on_promote(self, callback: Callable[[], Awaitable[None]]):
+        self._on_promote.append(callback)
+
+    def on_demote(self, callback: Callable[[], Awaitable[None]]):
+        self._on_demote.append(callback)
+
+    @property
+    def _uses_advisory_lock(self) -> bool:
+        return settings.leader_election and engine.dialect.name == "postgresql"
+
+    def start(self):
+        """Start electing inside the running event loop"""
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Step down and release the lock so another worker can take over at once"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self.is_leader:
+            await self._demote()
+        self._close_connection()
+
+    def dispatch(self, name: str, **payload):
+        """
+        Run a registered task on the leader, from any worker and any thread
+
+        The leader starts it as a background task; a follower queues it in
+        leader_tasks and notifies the leader. The payload must be
+        JSON-serialisable.
+        """
+        handler = self._handlers.get(name)
+        if handler is None:
+            raise ValueError(f"Unknown leader task {name!r}, registered: {', '.join(sorted(self._handlers))}")
+
+        if self.is_leader or not self._uses_advisory_lock:
+            if self._loop is None:
+                raise RuntimeError(f"Cannot run leader task {name!r}: leader election has not been started")
+            self._loop.call_soon_threadsafe(self._start_task, name, handler, payload)
+            return
+
+        # The row outlives a NOTIFY that no leader hears; both are sent on commit
+        with engine.begin() as connection:
+            connection.execute(insert(LeaderTask).values(task=name, payload=json.dumps(payload)))
+            connection.execute(text("SELECT pg_notify(:channel, '')"), {"channel": TASK_CHANNEL})
+
+    async def _run(self):
+        if not self._uses_advisory_lock:
+            await self._promote()
+            return
+
+        while True:
+            try:
+                if self.is_leader:
+                    self._heartbeat()
+                elif self._try_acquire():
+                    await self._promote()
+            except Exception as e:
+                print(f"Leader election error: {e}")
+                if self.is_leader:
+                    await self._demote()
+                self._close_connection()
+            await asyncio.sleep(settings.leader_heartbeat_seconds)
+
+    def _try_acquire(self) -> bool:
+        if self._connection is None:
+            self._connection = engine.raw_connection()
+            self._connection.driver_connection.autocommit = True
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", (settings.leader_lock_id,))
+            acquired = cursor.fetchone()[0]
+            if acquired:
+                cursor.execute(f"LISTEN {TASK_CHANNEL}")
+            return acquired
+        finally:
+            cursor.close()
+
+    def _heartbeat(self):
+        """Fail loudly if the lock connection is gone, since the lock went with it"""
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        finally:
+            cursor.close()
+        # The query may have pulled NOTIFYs off the socket, where add_reader won't see them
+        self._claim_tasks()
+
+    def _read_notifications(self):
+        """Claim the queued tasks when a follower signals new ones"""
+        try:
+            self._connection.driver_connection.poll()
+            self._claim_tasks()
+        except Exception as e:
+            print(f"Error reading leader notifications: {e}")
+
+    def _claim_tasks(self):
+        """Delete every queued task and start it; notifications only say there is something to claim"""
+        self._connection.driver_connection.notifies.clear()
+        cursor = self._connection.cursor()
+        try:
+            cursor.execute("DELETE FROM leader_tasks RETURNING id, task, payload")
+            rows = sorted(cursor.fetchall())
+        finally:
+            cursor.close()
+        for _, name, payload in rows:
+            try:
+                handler = self._handlers[name]
+                kwargs = json.loads(payload)
+            except (ValueError, KeyError) as e:
+                print(f"Ignoring leader task {name!r} {payload!r}: {e}")
+                continue
+            self._start_task(name, handler, kwargs)
+
+    def _start_task(self, name: str, handler: Callable[..., Awaitable[Any]], payload: Dict[str, Any]):
+        """Run a task handler in the background, keeping it referenced and reporting its failure"""
+        try:
+            task = asyncio.ensure_future(handler(**payload))
+        except TypeError as e:
+            # The payload doesn't fit the handler's signature
+            print(f"Error starting leader task {name}: {e}")
+            return
+        self._running.add(task)
+
+        def finished(task: asyncio.Task):
+            self._running.discard(task)
+            if not task.cancelled() and task.exception() is not None:
+                print(f"Error in leader task {name}: {task.exception()}")
+
+        task.add_done_callback(finished)
+
+    async def _promote(self):
+        self.is_leader = True
+        leader_changes.inc(transition="promoted")
+        print("This worker is now the leader")
+        if self._connection is not None:
+            self._loop.add_reader(self._connection.driver_connection.fileno(), self._read_notifications)
+        for callback in self._on_promote:
+            try:
+                await callback()
+            except Exception as e:
+                print(f"Error in leader promotion callback: {e}")
+        if self._connection is not None:
+            # Tasks queued while no worker was leader, now that the browser is up
+            try:
+                self._claim_tasks()
+            except Exception as e:
+                print(f"Error claiming queued leader tasks: {e}")
+
+    async def _demote(self):
+        self.is_leader = False
+        leader_changes.inc(transition="demoted")
+        print("This worker lost leadership")
+        for callback in self._on_demote:
+            try:
+                await callback()
+            except Exception as e:
+                print(f"Error in leader demotion callback: {e}")
+
+    def _close_connection(self):
+        if self._connection is None:
+            return
+        try:
+            self._loop.remove_reader(self._connection.driver_connection.fileno())
+        except Exception:
+            pass
+        try:
+            # Invalidate rather than return to the pool: the session may still hold the lock
+            self._connection.invalidate()
+        except Exception as e:
+            print(f"Error closing leader connection: {e}")
+        self._connection = None
+
+
+# Global instance
+leader = LeaderElector()
@@ -1,61 +1,507 @@
+from __future__ import annotations
+
 import asyncio
+import functools
 import json
 import os
+import time
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, List
-from playwright.async_api import async_playwright, Browser, Page, BrowserContext
-from cryptography.fernet import Fernet
+from typing import TYPE_CHECKING, Optional, List, Set, Tuple
+from urllib.parse import urlparse, parse_qsl, urlencode
 from app.config import settings
+from app.services.browser_lifecycle import BrowserLifecycleManager
+from app.services.metrics import registry
+
+# Playwright and cryptography are imported on the first browser action, so
+# processes that never drive the browser don't pay for loading them
+if TYPE_CHECKING:
+    from playwright.async_api import Playwright, Browser, Page, BrowserContext, Route
+
+
+blocked_requests_total = registry.counter(
+    "linkedin_browser_blocked_requests_total",
+    "Requests aborted by the automation browser's request filter, by resource type",
+    ("resource_type",),
+)
+method_duration = registry.histogram(
+    "linkedin_method_duration_seconds",
+    "Time spent in LinkedInService browser methods, by outcome",
+    ("method", "outcome"),
+)
+
+
+def _outcome(result) -> str:
+    """Methods report handled failures as False or (False, reason) rather than raising"""
+    if result is False or (isinstance(result, tuple) and result and result[0] is False):
+        return "error"
+    return "ok"
+
+
+def _timed(method):
+    """Observe the duration of a LinkedInService coroutine in method_duration"""
+    @functools.wraps(method)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await method(*args, **kwargs)
+            outcome = _outcome(result)
+            return result
+        finally:
+            method_duration.observe(time.perf_counter() - start, method=method.__name__, outcome=outcome)
+    return wrapper
+
+BROWSER_ARGS = [
+    '--disable-blink-features=AutomationControlled',
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+]
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+VIEWPORT = {'width': 1920, 'height': 1080}
+
+# Extracts every search result container in a single evaluate round trip
+SEARCH_RESULTS_JS = """
+() => {
+    const text = (root, selector) => {
+        const elem = root.querySelector(selector);
+        return elem ? elem.textContent : null;
+    };
+    const results = Array.from(document.querySelectorAll('.reusable-search__result-container')).map(container => {
+        const link = container.querySelector('a.app-aware-link[href*="/in/"]');
+        return {
+            href: link ? link.getAttribute('href') : null,
+            name: text(container, '.entity-result__title-text a, .search-result__result-link'),
+            title: text(container, '.entity-result__primary-subtitle, .search-result__snippets'),
+        };
+    });
+    const next = document.querySelector('button.artdeco-pagination__button--next');
+    return {
+        results,
+        end: !!document.querySelector('.search-results__end-of-results'),
+        hasNext: !!next && !next.disabled,
+    };
+}
+"""
+
+# Extracts every loaded conversation of the messaging inbox in one round trip
+INBOX_THREADS_JS = """
+() => Array.from(document.querySelectorAll('.msg-conversation-listitem')).map(item => {
+    const text = (selector) => {
+        const elem = item.querySelector(selector);
+        return elem ? elem.textContent.replace(/\\s+/g, ' ').trim() : null;
+    };
+    const thread = item.querySelector('a.msg-conversation-listitem__link, a[href*="/messaging/thread/"]');
+    const profile = item.querySelector('a[href*="/in/"]');
+    return {
+        threadHref: thread ? thread.getAttribute('href') : null,
+        profileHref: profile ? profile.getAttribute('href') : null,
+        name: text('.msg-conversation-listitem__participant-names'),
+        snippet: text('.msg-conversation-card__message-snippet'),
+        time: text('time.msg-conversation-listitem__time-stamp, .msg-conversation-card__time-stamp'),
+    };
+})
+"""
+
+# Inbox snippets of threads where we sent the last message start with one of these
+OUTBOUND_SNIPPET_PREFIXES = ('you:', 'vous :', 'vous:')
+
+# Collects the hrefs of the profile links matching a selector in one round trip
+PROFILE_LINKS_JS = """
+(selector) => {
+    const next = document.querySelector('button.artdeco-pagination__button--next');
+    return {
+        hrefs: Array.from(document.querySelectorAll(selector)).map(a => a.getAttribute('href')),
+        hasNext: !!next && !next.disabled,
+    };
+}
+"""
+
+
+def _split_setting(value: str) -> List[str]:
+    """Split a comma-separated setting into a list of lowercase entries"""
+    return [item.strip().lower() for item in value.split(",") if item.strip()]
+
+
+def _with_page_number(search_url: str, page_number: int) -> str:
+    """Set LinkedIn's page= query parameter on a search URL"""
+    if page_number <= 1:
+        return search_url
+    parts = urlparse(search_url)
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != 'page']
+    query.append(('page', str(page_number)))
+    return parts._replace(query=urlencode(query)).geturl()
+
+
+def _absolute_profile_url(href: Optional[str], base_url: Optional[str] = None) -> Optional[str]:
+    """Make a profile link absolute and drop query params, keeping it otherwise as LinkedIn wrote it"""
+    if not href or '/in/' not in href:
+        return None
+    profile_url = href.split('?')[0]
+    if not profile_url.startswith('http'):
+        profile_url = f"{(base_url or settings.linkedin_base_url).rstrip('/')}{profile_url}"
+    return profile_url
+
+
+def normalize_profile_url(href: Optional[str], base_url: Optional[str] = None) -> Optional[str]:
+    """
+    Profile link without query params or trailing slash, for comparing URLs
+
+    Only for matching: stored Profile.linkedin_url values keep the format
+    they were imported or scraped with, and may end with a slash.
+    """
+    profile_url = _absolute_profile_url(href, base_url)
+    return profile_url.rstrip('/') if profile_url else None
+
+
+def _parse_search_result(raw: dict, base_url: Optional[str] = None) -> Optional[dict]:
+    """Turn a result container extracted by SEARCH_RESULTS_JS into a profile dict"""
+    # Persisted as before, so re-scrapes still collide with existing rows on linkedin_url
+    profile_url = _absolute_profile_url(raw.get('href'), base_url)
+    if not profile_url:
+        return None
+
+    name = (raw.get('name') or '').strip() or "Unknown"
+    title = (raw.get('title') or '').strip() or None
+
+    # Extract company (sometimes in subtitle)
+    company = None
+    if title and ' at ' in title:
+        parts = title.split(' at ')
+        title = parts[0].strip()
+        company = parts[1].strip()
+
+    return {
+        'linkedin_url': profile_url,
+        'name': name,
+        'title': title,
+        'company': company,
+    }
+
+
+def _parse_inbox_time(text: Optional[str], now: datetime) -> datetime:
+    """
+    Parse the relative timestamp shown in the inbox list ("10:42 AM", "Mon", "Oct 3", "Oct 3, 2023")
+
+    Falls back to now when the format is not recognised.
+    """
+    text = (text or '').strip()
+    for fmt in ('%I:%M %p', '%H:%M'):
+        try:
+            parsed = datetime.strptime(text, fmt)
+            return now.replace(hour=parsed.hour, minute=parsed.minute, second=0, microsecond=0)
+        except ValueError:
+            pass
+
+    weekdays = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+    if text[:3].lower() in weekdays and len(text) <= 9:
+        days_ago = (now.weekday() - weekdays.index(text[:3].lower())) % 7 or 7
+        return now - timedelta(days=days_ago)
+
+    try:
+        return datetime.strptime(text, '%b %d, %Y')
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.strptime(f"{text} {now.year}", '%b %d %Y')
+        # Dates without a year are within the last twelve months
+        return parsed if parsed <= now else parsed.replace(year=now.year - 1)
+    except ValueError:
+        return now
+
+
+def _is_login_url(url: str) -> bool:
+    """Check whether LinkedIn redirected us to a login or auth wall page"""
+    return any(marker in url for marker in ('/login', '/authwall', '/checkpoint', '/uas/'))
 
 
 class LinkedInService:
-    def __init__(self):
+    def __init__(self, base_url: Optional[str] = None):
+        # Origin every navigation goes to; a local stand-in for benchmarks (see benchmarks/fake_linkedin.py)
+        self.base_url = (base_url or settings.linkedin_base_url).rstrip('/')
+        self.playwright: Optional[Playwright] = None
         self.browser: Optional[Browser] = None
         self.context: Optional[BrowserContext] = None
         self.page: Optional[Page] = None
-        self.cookies_dir = Path(".cookies")
-        self.cookies_dir.mkdir(exist_ok=True)
+        self.cookies_dir = Path(settings.browser_session_dir)
+        self.cookies_dir.mkdir(parents=True, exist_ok=True)
         self.cookies_file = self.cookies_dir / "linkedin_cookies.json"
         self._cipher = None
+        self._start_lock = asyncio.Lock()
+        self._shutting_down = False
+        self.blocked_resource_types = set(_split_setting(settings.browser_blocked_resource_types))
+        self.allowed_domains = _split_setting(settings.browser_allowed_domains)
+        base_host = (urlparse(self.base_url).hostname or '').lower()
+        if base_host and not any(base_host == domain or base_host.endswith(f".{domain}") for domain in self.allowed_domains):
+            self.allowed_domains.append(base_host)
+        self.navigation_stats = {'url': None, 'blocked_requests': 0, 'allowed_requests': 0, 'blocked_by_type': {}}
+        self.last_navigation_stats: Optional[dict] = None
+        self.total_blocked_requests = 0
+        self._session_confirmed_at: Optional[float] = None
+        self.lifecycle = BrowserLifecycleManager()
+
+    def _url(self, path: str) -> str:
+        """Absolute URL of a LinkedIn path on the configured base URL"""
+        return f"{self.base_url}{path}"
 
     def _get_cipher(self):
         """Get or create encryption cipher for cookies"""
         if self._cipher is None:
+            from cryptography.fernet import Fernet
             key = settings.secret_key.encode()[:32].ljust(32, b'0')
             from base64 import urlsafe_b64encode
             key = urlsafe_b64encode(key)
             self._cipher = Fernet(key)
         return self._cipher
 
+    @_timed
     async def start_browser(self):
-        """Start browser and load session"""
-        if self.browser is None:
-            playwright = await async_playwright().start()
-            self.browser = await playwright.chromium.launch(
+        """Start browser and load session, recycling it first if it is unhealthy"""
+        async with self._start_lock:
+            if self.context is None:
+                await self._launch()
+                return
+
+            reason = self.lifecycle.recycle_reason()
+            if reason:
+                await self._recycle(reason)
+
+    async def _launch(self):
+        """Launch Chromium and open a context with the saved session"""
+        from playwright.async_api import async_playwright
+        self.playwright = await async_playwright().start()
+        if settings.browser_user_data_dir:
+            # Persistent profile: HTTP cache, cookies and local storage survive restarts
+            self.context = await self.playwright.chromium.launch_persistent_context(
+                settings.browser_user_data_dir,
                 headless=True,
-                args=[
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-dev-shm-usage',
-                    '--no-sandbox',
-                ]
+                args=BROWSER_ARGS,
+                user_agent=USER_AGENT,
+                viewport=VIEWPORT,
             )
-            self.context = await self.browser.new_context(
-                user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                viewport={'width': 1920, 'height': 1080},
+            self.browser = self.context.browser
+            # Closing a persistent context means the browser is gone
+            self.context.on("close", lambda _: self._on_browser_lost("persistent context closed"))
+            await self._prepare_context()
+        else:
+            self.browser = await self.playwright.chromium.launch(
+                headless=True,
+                args=BROWSER_ARGS,
             )
-            self.page = await self.context.new_page()
-
-            # Load cookies if they exist
-            if self.cookies_file.exists():
-                try:
-                    cipher = self._get_cipher()
-                    encrypted = self.cookies_file.read_bytes()
-                    decrypted = cipher.decrypt(encrypted)
-                    cookies = json.loads(decrypted.decode())
-                    await self.context.add_cookies(cookies)
-                except Exception as e:
-                    print(f"Error loading cookies: {e}")
+            self.browser.on("disconnected", lambda _: self._on_browser_lost("browser disconnected"))
+            await self._open_context()
+        self.lifecycle.record_launch()
+
+    async def _open_context(self):
+        """Create a fresh context in the running browser from the saved session"""
+        session = self._load_session()
+        self.context = await self.browser.new_context(
+            user_agent=USER_AGENT,
+            viewport=VIEWPORT,
+            storage_state=session if isinstance(session, dict) else None,
+        )
+        await self._prepare_context()
+
+    async def _prepare_context(self):
+        """Install request interception, open the shared page and restore cookies"""
+        if settings.browser_block_resources:
+            await self.context.route("**/*", self._handle_route)
+        self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+        self.page.on("crash", lambda _: self._on_browser_lost("page crashed"))
+        await self._restore_cookies()
+
+    def _on_browser_lost(self, reason: str):
+        """Playwright event handler: flag a crash unless we are closing the browser ourselves"""
+        if not self._shutting_down:
+            self.lifecycle.record_crash(reason)
+
+    async def _recycle(self, reason: str):
+        """
+        Replace the context or the whole browser without losing the session
+
+        The session is saved first (unless the browser crashed) and the new
+        context is created from it. Crashes, memory pressure and persistent
+        profiles need a full restart; otherwise a new context is enough.
+        """
+        print(f"Recycling automation browser ({reason}): {self.lifecycle.snapshot()}")
+        if reason != "crash":
+            try:
+                await self._save_session()
+            except Exception as e:
+                print(f"Error saving session before recycling: {e}")
+        else:
+            self.invalidate_session()
+
+        if reason in ("crash", "rss") or settings.browser_user_data_dir:
+            await self._shutdown()
+            await self._launch()
+            self.lifecycle.record_restart(reason)
+        else:
+            try:
+                await self.context.close()
+            except Exception as e:
+                print(f"Error closing browser context: {e}")
+            await self._open_context()
+            self.lifecycle.record_recycle(reason)
+
+    async def _shutdown(self):
+        """Close the context, the browser and the Playwright driver, ignoring errors from dead processes"""
+        self._shutting_down = True
+        for closable in (self.context, self.browser):
+            if closable is None:
+                continue
+            try:
+                await closable.close()
+            except Exception as e:
+                print(f"Error closing browser: {e}")
+        if self.playwright is not None:
+            try:
+                await self.playwright.stop()
+            except Exception as e:
+                print(f"Error stopping Playwright: {e}")
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.page = None
+        self._shutting_down = False
+
+    def _load_session(self):
+        """
+        Decrypt the saved session file
+
+        Returns the storage state dict written by _save_session, the cookie
+        list written by older versions, or None if there is no usable session.
+        """
+        if not self.cookies_file.exists():
+            return None
+        try:
+            cipher = self._get_cipher()
+            encrypted = self.cookies_file.read_bytes()
+            decrypted = cipher.decrypt(encrypted)
+            return json.loads(decrypted.decode())
+        except Exception as e:
+            print(f"Error loading cookies: {e}")
+            return None
+
+    async def _save_session(self):
+        """Encrypt and save the context's cookies and local storage"""
+        storage_state = await self.context.storage_state()
+        cipher = self._get_cipher()
+        encrypted = cipher.encrypt(json.dumps(storage_state).encode())
+        self.cookies_file.write_bytes(encrypted)
+
+    async def _restore_cookies(self):
+        """Add saved cookies to contexts that did not get them from storage_state"""
+        session = self._load_session()
+        if isinstance(session, list):
+            cookies = session
+        elif isinstance(session, dict) and settings.browser_user_data_dir:
+            cookies = session.get('cookies', [])
+        else:
+            # Fresh contexts already loaded the storage state on creation
+            return
+
+        if settings.browser_user_data_dir:
+            # A persistent profile keeps its own, possibly newer, session cookie
+            existing = await self.context.cookies(self.base_url)
+            if any(cookie['name'] == 'li_at' for cookie in existing):
+                return
+
+        try:
+            await self.context.add_cookies(cookies)
+        except Exception as e:
+            print(f"Error loading cookies: {e}")
+
+    @_timed
+    async def warm_up(self):
+        """Launch the browser and load the feed ahead of the first action"""
+        try:
+            await self.ensure_logged_in()
+            await self._save_session()
+            print("LinkedIn browser warmed up")
+        except Exception as e:
+            print(f"Warning: Could not warm up LinkedIn browser: {e}")
+
+    def _should_block(self, url: str, resource_type: str) -> bool:
+        """Check whether a request is non-essential for automation"""
+        if resource_type == 'document':
+            # Never abort navigations, even cross-domain redirects
+            return False
+        if resource_type in self.blocked_resource_types:
+            return True
+        host = (urlparse(url).hostname or '').lower()
+        if not host:
+            return False
+        return not any(host == domain or host.endswith(f".{domain}") for domain in self.allowed_domains)
+
+    async def _handle_route(self, route: Route):
+        """Abort images, media, fonts and third-party requests before they hit the network"""
+        request = route.request
+        if self._should_block(request.url, request.resource_type):
+            blocked_by_type = self.navigation_stats['blocked_by_type']
+            blocked_by_type[request.resource_type] = blocked_by_type.get(request.resource_type, 0) + 1
+            self.navigation_stats['blocked_requests'] += 1
+            self.total_blocked_requests += 1
+            blocked_requests_total.inc(resource_type=request.resource_type)
+            await route.abort()
+        else:
+            self.navigation_stats['allowed_requests'] += 1
+            await route.continue_()
+
+    async def _navigate(self, url: str, **kwargs):
+        """Navigate the shared page, keeping per-navigation counts of blocked and allowed requests"""
+        self.navigation_stats = {'url': url, 'blocked_requests': 0, 'allowed_requests': 0, 'blocked_by_type': {}}
+        self.lifecycle.record_navigation()
+        try:
+            return await self.page.goto(url, **kwargs)
+        finally:
+            self.last_navigation_stats = self.navigation_stats
+
+    def _session_is_fresh(self) -> bool:
+        """Check whether the login was confirmed recently enough to skip the feed check"""
+        if self._session_confirmed_at is None:
+            return False
+        return time.monotonic() - self._session_confirmed_at < settings.session_check_ttl
+
+    def _mark_session_valid(self):
+        """Remember that the current page proved we are logged in"""
+        self._session_confirmed_at = time.monotonic()
+
+    def invalidate_session(self):
+        """Forget the cached login state so the next action re-checks it"""
+        self._session_confirmed_at = None
+
+    async def _relogin(self):
+        """Log in again after LinkedIn dropped the session"""
+        if settings.linkedin_email and settings.linkedin_password:
+            await self.login()
+        else:
+            raise Exception("Not logged in and no credentials provided")
+
+    async def _goto(self, url: str, check_session: bool = True, **kwargs):
+        """
+        Navigate to a LinkedIn page, using the landing URL as the session check
+
+        A redirect to the login page or auth wall invalidates the cached session,
+        triggers a re-login and retries the navigation once. Any other landing
+        page confirms the session is still valid.
+        """
+        response = await self._navigate(url, **kwargs)
+        if not check_session:
+            return response
 
+        if _is_login_url(self.page.url):
+            print(f"Session expired while loading {url}, logging in again")
+            self.invalidate_session()
+            await self._relogin()
+            response = await self._navigate(url, **kwargs)
+            if _is_login_url(self.page.url):
+                raise Exception("Not logged in after re-login")
+
+        self._mark_session_valid()
+        return response
+
+    @_timed
     async def login(self, email: Optional[str] = None, password: Optional[str] = None):
         """Login to LinkedIn"""
         await self.start_browser()
@@ -66,7 +512,7 @@ class LinkedInService:
         if not email or not password:
             raise ValueError("LinkedIn email and password are required")
 
-        await self.page.goto("https://www.linkedin.com/login")
+        await self._goto(self._url("/login"), check_session=False)
         await asyncio.sleep(2)
 
         # Fill login form
@@ -79,12 +525,10 @@ class LinkedInService:
         await asyncio.sleep(3)
 
         # Check if login was successful
-        if "feed" in self.page.url or "linkedin.com/in/" in self.page.url:
-            # Save cookies
-            cookies = await self.context.cookies()
-            cipher = self._get_cipher()
-            encrypted = cipher.encrypt(json.dumps(cookies).encode())
-            self.cookies_file.write_bytes(encrypted)
+        if "feed" in self.page.url or "/in/" in self.page.url:
+            # Save cookies and local storage
+            await self._save_session()
+            self._mark_session_valid()
             return True
         else:
             # Check for error messages
@@ -94,19 +538,24 @@ class LinkedInService:
                 raise Exception(f"Login failed: {error_text}")
             raise Exception("Login failed: Unknown error")
 
+    @_timed
     async def ensure_logged_in(self):
-        """Ensure we're logged in, redirect to login if not"""
+        """
+        Ensure we're logged in, redirect to login if not
+
+        The feed is only reloaded when the session has not been confirmed within
+        session_check_ttl. Otherwise the action's own navigation acts as the
+        check: a redirect to the login page re-logs in and retries (see _goto).
+        """
         await self.start_browser()
-        await self.page.goto("https://www.linkedin.com/feed")
-        await asyncio.sleep(2)
+        if self._session_is_fresh():
+            return
 
-        # Check if we're logged in
-        if "login" in self.page.url:
-            if settings.linkedin_email and settings.linkedin_password:
-                await self.login()
-            else:
-                raise Exception("Not logged in and no credentials provided")
+        # _goto logs in again if the feed redirects to the login page
+        await self._goto(self._url("/feed"))
+        await asyncio.sleep(2)
 
+    @_timed
     async def send_connection_request(self, profile_url: str, message: str) -> tuple[bool, str | None]:
         """
         Send a connection request with a message
@@ -119,7 +568,7 @@ class LinkedInService:
         try:
             # Navigate to profile with timeout and error handling
             try:
-                response = await self.page.goto(profile_url, wait_until="networkidle", timeout=30000)
+                response = await self._goto(profile_url, wait_until="networkidle", timeout=30000)
                 if response and response.status >= 400:
                     if response.status == 429:
                         return (False, "Rate limit exceeded - too many requests")
@@ -248,13 +697,14 @@ class LinkedInService:
             else:
                 return (False, f"Error: {error_msg}")
 
+    @_timed
     async def send_message(self, profile_url: str, message: str) -> bool:
         """Send a message to an existing connection"""
         await self.ensure_logged_in()
         
         try:
             # Navigate to profile
-            await self.page.goto(profile_url)
+            await self._goto(profile_url)
             await asyncio.sleep(3)
 
             # Click Message button
@@ -292,6 +742,7 @@ class LinkedInService:
             print(f"Error sending message: {e}")
             return False
 
+    @_timed
     async def scrape_profile_details(self, profile_url: str) -> dict:
         """
         Scrape detailed information from a LinkedIn profile page
@@ -305,7 +756,7 @@ class LinkedInService:
         await self.ensure_logged_in()
         
         try:
-            await self.page.goto(profile_url)
+            await self._goto(profile_url)
             await asyncio.sleep(3)
             
             profile_data = {
@@ -388,125 +839,200 @@ class LinkedInService:
             print(f"Error scraping profile details: {e}")
             return {'linkedin_url': profile_url}
 
-    async def scrape_search_results(self, search_url: str, max_results: int = 50) -> List[dict]:
+    @_timed
+    async def scrape_search_results_page(
+        self,
+        search_url: str,
+        page_number: int = 1,
+        max_results: int = 50,
+    ) -> Tuple[List[dict], bool]:
         """
-        Scrape LinkedIn search results page and extract profile information
-        
+        Scrape one page of LinkedIn search results
+
         Args:
             search_url: LinkedIn search URL (e.g., https://www.linkedin.com/search/results/people/...)
-            max_results: Maximum number of profiles to scrape
-            
+            page_number: Results page to load (LinkedIn's page= query parameter)
+            max_results: Maximum number of profiles to return from this page
+
         Returns:
-            List of dictionaries with profile information
+            Tuple of (profiles, has_more) where has_more tells whether a next page exists
         """
         await self.ensure_logged_in()
-        
-        profiles = []
+
+        profiles: List[dict] = []
+        await self._goto(_with_page_number(search_url, page_number))
+        await asyncio.sleep(3)
+
+        # Wait for search results to load
         try:
-            # Navigate to search URL
-            await self.page.goto(search_url)
-            await asyncio.sleep(3)
-            
-            # Wait for search results to load
             await self.page.wait_for_selector('.reusable-search__result-container', timeout=10000)
+        except Exception:
+            # No results on this page
+            return profiles, False
+        await asyncio.sleep(2)
+
+        # Scroll until lazily rendered results stop appearing
+        has_more = False
+        while len(profiles) < max_results:
+            # One round trip extracts every result container on the page
+            snapshot = await self.page.evaluate(SEARCH_RESULTS_JS)
+            has_more = snapshot['hasNext']
+            seen = {p['linkedin_url'] for p in profiles}
+            new_profiles = []
+            for raw in snapshot['results']:
+                profile = _parse_search_result(raw, self.base_url)
+                if profile and profile['linkedin_url'] not in seen:
+                    seen.add(profile['linkedin_url'])
+                    new_profiles.append(profile)
+            profiles.extend(new_profiles)
+
+            if not new_profiles or snapshot['end'] or len(profiles) >= max_results:
+                break
+            await self.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
             await asyncio.sleep(2)
-            
-            # Scroll to load more results
-            scroll_count = 0
-            max_scrolls = max_results // 10  # LinkedIn shows ~10 results per scroll
-            
-            while len(profiles) < max_results and scroll_count < max_scrolls:
-                # Get all result containers
-                result_containers = await self.page.query_selector_all('.reusable-search__result-container')
-                
-                for container in result_containers:
-                    if len(profiles) >= max_results:
-                        break
-                    
-                    try:
-                        # Extract profile link
-                        profile_link_elem = await container.query_selector('a.app-aware-link[href*="/in/"]')
-                        if not profile_link_elem:
-                            continue
-                        
-                        profile_url = await profile_link_elem.get_attribute('href')
-                        if not profile_url or '/in/' not in profile_url:
-                            continue
-                        
-                        # Make sure URL is complete
-                        if not profile_url.startswith('http'):
-                            profile_url = f"https://www.linkedin.com{profile_url.split('?')[0]}"
-                        else:
-                            profile_url = profile_url.split('?')[0]  # Remove query params
-                        
-                        # Extract name
-                        name_elem = await container.query_selector('.entity-result__title-text a, .search-result__result-link')
-                        name = "Unknown"
-                        if name_elem:
-                            name_text = await name_elem.text_content()
-                            if name_text:
-                                name = name_text.strip()
-                        
-                        # Extract title/headline
-                        title_elem = await container.query_selector('.entity-result__primary-subtitle, .search-result__snippets')
-                        title = None
-                        if title_elem:
-                            title_text = await title_elem.text_content()
-                            if title_text:
-                                title = title_text.strip()
-                        
-                        # Extract company (sometimes in subtitle)
-                        company = None
-                        if title and ' at ' in title:
-                            parts = title.split(' at ')
-                            if len(parts) > 1:
-                                title = parts[0].strip()
-                                company = parts[1].strip()
-                        
-                        # Skip if we already have this profile
-                        if any(p.get('linkedin_url') == profile_url for p in profiles):
-                            continue
-                        
-                        profiles.append({
-                            'linkedin_url': profile_url,
-                            'name': name,
-                            'title': title,
-                            'company': company,
-                        })
-                        
-                    except Exception as e:
-                        print(f"Error extracting profile from container: {e}")
-                        continue
-                
-                # Scroll down to load more results
-                if len(profiles) < max_results:
-                    await self.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
-                    await asyncio.sleep(2)
-                    scroll_count += 1
-                    
-                    # Check if we've reached the end
-                    try:
-                        end_indicator = await self.page.query_selector('.search-results__end-of-results')
-                        if end_indicator:
-                            break
-                    except:
-                        pass
-            
+
+        return profiles[:max_results], has_more
+
+    @_timed
+    async def scrape_search_results(self, search_url: str, max_results: int = 50, start_page: int = 1) -> List[dict]:
+        """
+        Scrape LinkedIn search results and extract profile information
+
+        Args:
+            search_url: LinkedIn search URL (e.g., https://www.linkedin.com/search/results/people/...)
+            max_results: Maximum number of profiles to scrape
+            start_page: Results page to start from
+
+        Returns:
+            List of dictionaries with profile information
+        """
+        profiles: List[dict] = []
+        page_number = start_page
+        try:
+            while len(profiles) < max_results:
+                page_profiles, has_more = await self.scrape_search_results_page(
+                    search_url,
+                    page_number,
+                    max_results=max_results - len(profiles),
+                )
+                seen = {p['linkedin_url'] for p in profiles}
+                profiles.extend(p for p in page_profiles if p['linkedin_url'] not in seen)
+                if not page_profiles or not has_more:
+                    break
+                page_number += 1
             return profiles[:max_results]
-            
+
         except Exception as e:
             print(f"Error scraping search results: {e}")
             return profiles
 
+    @_timed
+    async def scrape_sent_invitations(self, max_pages: int = 10) -> Set[str]:
+        """
+        Collect the profile URLs of every invitation still awaiting a response
+
+        Walks the paginated sent-invitations manager, extracting each page's
+        links in a single evaluate call.
+        """
+        await self.ensure_logged_in()
+
+        profile_urls: Set[str] = set()
+        for page_number in range(1, max_pages + 1):
+            await self._goto(_with_page_number(self._url("/mynetwork/invitation-manager/sent/"), page_number))
+            await asyncio.sleep(2)
+            snapshot = await self.page.evaluate(PROFILE_LINKS_JS, '.invitation-card a[href*="/in/"]')
+            page_urls = {url for url in (normalize_profile_url(href, self.base_url) for href in snapshot['hrefs']) if url}
+            profile_urls |= page_urls
+            if not page_urls or not snapshot['hasNext']:
+                break
+        return profile_urls
+
+    @_timed
+    async def scrape_connections(self, wanted: Optional[Set[str]] = None, max_pages: int = 10) -> Set[str]:
+        """
+        Collect profile URLs from the connections list, most recent first
+
+        The list grows by infinite scroll; each scroll is one "page". Stops
+        early once every URL in wanted has been seen, since recently accepted
+        invitations sit at the top of the list.
+        """
+        await self.ensure_logged_in()
+
+        await self._goto(self._url("/mynetwork/invite-connect/connections/"))
+        await asyncio.sleep(3)
+
+        profile_urls: Set[str] = set()
+        for _ in range(max_pages):
+            snapshot = await self.page.evaluate(PROFILE_LINKS_JS, '.mn-connection-card a[href*="/in/"]')
+            page_urls = {url for url in (normalize_profile_url(href, self.base_url) for href in snapshot['hrefs']) if url}
+            new_urls = page_urls - profile_urls
+            profile_urls |= page_urls
+            if not new_urls or (wanted is not None and wanted <= profile_urls):
+                break
+
+            # Load the next batch of connections
+            await self.page.evaluate('window.scrollTo(0, document.body.scrollHeight)')
+            show_more = await self.page.query_selector('button.scaffold-finite-scroll__load-button')
+            if show_more:
+                await show_more.click()
+            await asyncio.sleep(2)
+        return profile_urls
+
+    @_timed
+    async def scrape_inbox(self, max_threads: int = 100) -> List[dict]:
+        """
+        Collect the inbox conversations whose last message was sent to us
+
+        Scrolls the conversation list until max_threads are loaded, then
+        extracts all of them in a single evaluate call.
+
+        Returns:
+            List of dicts with thread_url, profile_url, participant_name,
+            snippet and last_inbound_at
+        """
+        await self.ensure_logged_in()
+
+        await self._goto(self._url("/messaging/"))
+        await asyncio.sleep(3)
+
+        loaded = 0
+        while loaded < max_threads:
+            count = await self.page.evaluate(
+                "() => document.querySelectorAll('.msg-conversation-listitem').length"
+            )
+            if count <= loaded:
+                break
+            loaded = count
+            # The conversation list scrolls inside its own container
+            await self.page.evaluate(
+                "() => { const list = document.querySelector('.msg-conversations-container__conversations-list');"
+                " if (list) { list.scrollTop = list.scrollHeight; } }"
+            )
+            await asyncio.sleep(2)
+
+        now = datetime.utcnow()
+        threads = []
+        for raw in (await self.page.evaluate(INBOX_THREADS_JS))[:max_threads]:
+            snippet = raw.get('snippet') or ''
+            if not raw.get('threadHref') or snippet.lower().startswith(OUTBOUND_SNIPPET_PREFIXES):
+                continue
+            thread_url = raw['threadHref'].split('?')[0]
+            if not thread_url.startswith('http'):
+                thread_url = self._url(thread_url)
+            threads.append({
+                'thread_url': thread_url,
+                'profile_url': normalize_profile_url(raw.get('profileHref'), self.base_url),
+                'participant_name': raw.get('name'),
+                'snippet': snippet[:1000],
+                'last_inbound_at': _parse_inbox_time(raw.get('time'), now),
+            })
+        return threads
+
     async def close(self):
         """Close browser"""
-        if self.context:
-            await self.context.close()
-        if self.browser:
-            await self.browser.close()
-        self.browser = None
-        self.context = None
-        self.page = None
+        async with self._start_lock:
+            await self._shutdown()
+        self.invalidate_session()
 
 
 # Global instance
@@ -1,16 +1,36 @@
-from mistralai import Mistral
+import time
 from typing import Optional
 from app.config import settings as config_settings
 from app.models.profile import Profile
 from app.models.message import Message
 from app.database import SessionLocal
 from app.models.settings import AppSettings
+from app.services.metrics import registry
+
+
+mistral_duration = registry.histogram(
+    "mistral_request_duration_seconds",
+    "Latency of Mistral chat completions, by message kind and outcome",
+    ("kind", "outcome"),
+)
+message_fallbacks = registry.counter(
+    "message_generation_fallbacks_total",
+    "Messages generated from the fallback template instead of Mistral",
+    ("kind",),
+)
 
 
 class MessageGenerator:
     def __init__(self):
+        # The template backend never calls Mistral, so it needs no API key
+        self.use_templates = config_settings.message_generator_backend == "template"
+        if self.use_templates:
+            self.client = None
+            return
         if not config_settings.mistral_api_key:
             raise ValueError("MISTRAL_API_KEY environment variable is required")
+        # Imported here so processes that never generate a message don't load the SDK
+        from mistralai import Mistral
         self.client = Mistral(api_key=config_settings.mistral_api_key)
     
     def _get_company_context(self) -> str:
@@ -35,6 +55,9 @@ class MessageGenerator:
 
     def generate_connection_message(self, profile: Profile) -> str:
         """Generate a personalized connection message in French"""
+        if self.use_templates:
+            return self._fallback_connection_message(profile)
+
         # Get company context from database
         company_context = self._get_company_context()
         
@@ -59,23 +82,22 @@ Le message doit être:
 Retourne uniquement le texte du message, sans commentaire supplémentaire."""
 
         try:
-            response = self.client.chat.complete(
-                model="mistral-medium-latest",
-                messages=[
-                    {"role": "system", "content": "Tu es un assistant de networking professionnel qui crée des messages de demande de connexion LinkedIn personnalisés en français."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200,
-                temperature=0.7
+            return self._complete(
+                "connection",
+                "Tu es un assistant de networking professionnel qui crée des messages de demande de connexion LinkedIn personnalisés en français.",
+                prompt
             )
-            return response.choices[0].message.content.strip()
         except Exception as e:
             print(f"Error generating message: {e}")
             # Fallback to template
+            message_fallbacks.inc(kind="connection")
             return self._fallback_connection_message(profile)
 
     def generate_followup_message(self, profile: Profile, previous_messages: list[Message]) -> str:
         """Generate a follow-up message in French based on conversation history"""
+        if self.use_templates:
+            return self._fallback_followup_message(profile)
+
         previous_content = "\n".join([f"- {msg.content}" for msg in previous_messages])
         
         # Get company context from database
@@ -102,21 +124,36 @@ Le message de suivi doit être:
 
 Retourne uniquement le texte du message, sans commentaire supplémentaire."""
 
+        try:
+            return self._complete(
+                "followup",
+                "Tu es un assistant de networking professionnel qui crée des messages de suivi LinkedIn personnalisés en français.",
+                prompt
+            )
+        except Exception as e:
+            print(f"Error generating follow-up: {e}")
+            # Fallback to template
+            message_fallbacks.inc(kind="followup")
+            return self._fallback_followup_message(profile)
+
+    def _complete(self, kind: str, system_prompt: str, prompt: str) -> str:
+        """Run one Mistral chat completion and record its latency"""
+        start = time.perf_counter()
+        outcome = "error"
         try:
             response = self.client.chat.complete(
                 model="mistral-medium-latest",
                 messages=[
-                    {"role": "system", "content": "Tu es un assistant de networking professionnel qui crée des messages de suivi LinkedIn personnalisés en français."},
+                    {"role": "system", "content": system_prompt},
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=200,
                 temperature=0.7
             )
+            outcome = "ok"
             return response.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"Error generating follow-up: {e}")
-            # Fallback to template
-            return self._fallback_followup_message(profile)
+        finally:
+            mistral_duration.observe(time.perf_counter() - start, kind=kind, outcome=outcome)
 
     def _fallback_connection_message(self, profile: Profile) -> str:
         """Fallback template message in French"""
@@ -0,0 +1,94 @@
+"""
+On-demand sampling profiles of requests, scheduler jobs and connection runs
+
+Profiling is off unless profiling_enabled and profiling_token are set, and
+every trigger must present the token in an X-Profile header. Reports are pyinstrument HTML call trees written to
+profiling_output_dir on the worker that ran the profiled code.
+"""
+import functools
+import hmac
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Set
+from app.config import settings
+
+# Targets armed to be profiled on their next run, in this process
+_armed: Set[str] = set()
+
+_REPORT_NAME = re.compile(r"^[\w.-]+\.html$")
+
+
+def is_authorized(token: Optional[str]) -> bool:
+    """Profiling is enabled and the token matches profiling_token"""
+    if not settings.profiling_enabled or not settings.profiling_token or not token:
+        return False
+    return hmac.compare_digest(token.encode(), settings.profiling_token.encode())
+
+
+def start_profiler():
+    """Start an async-aware sampling profiler, or return None when it can't run and the code should run unprofiled"""
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        print("Profiling requested but pyinstrument is not installed")
+        return None
+    profiler = Profiler(interval=settings.profiling_interval, async_mode="enabled")
+    try:
+        profiler.start()
+    except RuntimeError as e:
+        # pyinstrument allows one async-mode profiler per context, e.g. a profiled request calling an armed job
+        print(f"Could not start the profiler, running unprofiled: {e}")
+        return None
+    return profiler
+
+
+def save_report(profiler, label: str) -> str:
+    """Write the profiler's HTML report and return its file name"""
+    directory = Path(settings.profiling_output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    safe_label = re.sub(r"[^\w.-]+", "_", label).strip("_")[:80] or "profile"
+    name = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}_{safe_label}.html"
+    (directory / name).write_text(profiler.output_html())
+    print(f"Saved profile {name}")
+    return name
+
+
+def list_reports() -> List[str]:
+    directory = Path(settings.profiling_output_dir)
+    if not directory.is_dir():
+        return []
+    return sorted((path.name for path in directory.glob("*.html")), reverse=True)
+
+
+def report_path(name: str) -> Optional[Path]:
+    """Resolve a report name from list_reports(), refusing anything that is not a plain file name"""
+    if not _REPORT_NAME.match(name):
+        return None
+    path = Path(settings.profiling_output_dir) / name
+    return path if path.is_file() else None
+
+
+async def arm(target: str):
+    """Profile the next run of target (a scheduler job name or process_connection)"""
+    _armed.add(target)
+    print(f"Profiler armed for the next run of {target}")
+
+
+def profile_when_armed(target: str):
+    """Decorator that profiles one run of a coroutine function after arm(target)"""
+    def decorate(function: Callable[..., Awaitable]):
+        @functools.wraps(function)
+        async def wrapper(*args, **kwargs):
+            if target not in _armed:
+                return await function(*args, **kwargs)
+            _armed.discard(target)
+            profiler = start_profiler()
+            try:
+                return await function(*args, **kwargs)
+            finally:
+                if profiler is not None:
+                    profiler.stop()
+                    save_report(profiler, target)
+        return wrapper
+    return decorate
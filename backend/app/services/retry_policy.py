@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from app.config import settings
+
+
+# Failure reasons that another attempt cannot fix; anything else is worth retrying
+PERMANENT_FAILURE_MARKERS = (
+    "only allows following",
+    "restricted or unavailable",
+    "connect button not found",
+    "not found or inaccessible",
+    "profile or element not found",
+)
+
+# A 403 means LinkedIn is throttling or restricting our account, not that the
+# profile can't be reached: retry, but only after a long pause
+ACCOUNT_RESTRICTED_MARKERS = (
+    "access forbidden",
+)
+
+
+def is_transient_failure(reason: Optional[str]) -> bool:
+    """Whether a connection failure_reason may succeed on a later attempt"""
+    if not reason:
+        return True
+    reason = reason.lower()
+    return not any(marker in reason for marker in PERMANENT_FAILURE_MARKERS)
+
+
+def retry_delay(attempt_count: int, reason: Optional[str] = None) -> timedelta:
+    """Exponential backoff: retry_delay_base, then twice that, four times that..."""
+    delay = settings.retry_delay_base * 2 ** max(attempt_count - 1, 0)
+    if reason and any(marker in reason.lower() for marker in ACCOUNT_RESTRICTED_MARKERS):
+        delay = max(delay, settings.account_restricted_retry_delay)
+    return timedelta(seconds=delay)
+
+
+def record_failed_attempt(connection, reason: str, now: Optional[datetime] = None):
+    """
+    Mark a connection failed and schedule its next automatic attempt
+
+    Transient failures are retried after an exponential backoff until
+    max_retries retries have been spent; permanent failures and exhausted
+    connections get no next_attempt_at and are left for a manual retry.
+    """
+    now = now or datetime.utcnow()
+    connection.failure_reason = reason
+    connection.attempt_count = (connection.attempt_count or 0) + 1
+    if is_transient_failure(reason) and connection.attempt_count <= settings.max_retries:
+        connection.next_attempt_at = now + retry_delay(connection.attempt_count, reason)
+    else:
+        connection.next_attempt_at = None
+
+
+def record_successful_attempt(connection):
+    connection.failure_reason = None
+    connection.attempt_count = 0
+    connection.next_attempt_at = None
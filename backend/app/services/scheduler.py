@@ -1,134 +1,572 @@
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.interval import IntervalTrigger
-from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
-from app.database import SessionLocal
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select, func, or_, exists, literal
+from sqlalchemy.orm import Session, aliased, selectinload
+from typing import Awaitable, Callable, List, Optional
+from app.database import SessionLocal, session_scope, upsert, insert_from_select_ignore_conflicts
+from app.models.profile import Profile
 from app.models.connection import Connection, ConnectionStatus
 from app.models.message import Message, MessageType
 from app.models.followup import FollowUp, FollowUpStatus
-from app.services.linkedin import linkedin_service
+from app.models.inbound_message import InboundMessage
+from app.models.scrape_job import ScrapeJob, ScrapeJobStatus
+from app.services.linkedin import linkedin_service, normalize_profile_url
+from app.services.browser_executor import browser_executor, ActionPriority
 from app.services.message_generator import message_generator
+from app.services.metrics import registry
+from app.services.stage_timer import StageTrace
+from app.services.profiling import profile_when_armed
 from app.config import settings
 import asyncio
+import functools
+import time
 
-scheduler = AsyncIOScheduler()
+# Created by start_scheduler, so only the leader imports APScheduler
+scheduler = None
 
+job_duration = registry.histogram(
+    "scheduler_job_duration_seconds",
+    "Duration of background scheduler jobs, by outcome",
+    ("job", "outcome"),
+)
 
-async def process_pending_followups():
-    """Process all pending follow-ups that are due"""
-    db: Session = SessionLocal()
+
+def timed_job(name: str, job: Callable[[], Awaitable[None]]) -> Callable[[], Awaitable[None]]:
+    """Wrap a scheduler job so every run is observed in job_duration, and profiled when armed"""
+    @functools.wraps(job)
+    @profile_when_armed(name)
+    async def run():
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            await job()
+            outcome = "ok"
+        finally:
+            job_duration.observe(time.perf_counter() - start, job=name, outcome=outcome)
+    return run
+
+
+def _backlog(count_query: Callable[[Session], int]) -> Callable[[], int]:
+    """Gauge function counting a backlog in its own short session at render time"""
+    def read():
+        with session_scope() as db:
+            return count_query(db)
+    return read
+
+
+registry.gauge("followups_pending", "Follow-ups waiting to be sent").set_function(_backlog(
+    lambda db: db.query(FollowUp).filter(FollowUp.status == FollowUpStatus.PENDING).count()
+))
+registry.gauge("followups_overdue", "Pending follow-ups whose scheduled time has passed").set_function(_backlog(
+    lambda db: db.query(FollowUp).filter(
+        FollowUp.status == FollowUpStatus.PENDING,
+        FollowUp.scheduled_at <= datetime.utcnow()
+    ).count()
+))
+registry.gauge("connection_retries_scheduled", "Failed connections with an automatic retry scheduled").set_function(_backlog(
+    lambda db: db.query(Connection).filter(
+        Connection.status == ConnectionStatus.FAILED,
+        Connection.next_attempt_at.isnot(None)
+    ).count()
+))
+registry.gauge("scrape_jobs_active", "Search scrape jobs queued or running").set_function(_backlog(
+    lambda db: db.query(ScrapeJob).filter(
+        ScrapeJob.status.in_([ScrapeJobStatus.QUEUED, ScrapeJobStatus.RUNNING])
+    ).count()
+))
+
+
+class DueTimeWorker:
+    """
+    Run a job when its next due time arrives, or as soon as new work is signalled
+
+    Between runs the worker sleeps until next_due() (or max_sleep, whichever
+    comes first) and wakes early when notify() is called. Signals received
+    while the job is running coalesce into a single re-run instead of stacking.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        job: Callable[[], Awaitable[None]],
+        next_due: Optional[Callable[[], Optional[datetime]]] = None,
+        max_sleep: timedelta = timedelta(hours=1),
+    ):
+        self.name = name
+        self.job = timed_job(name, job)
+        self.next_due = next_due
+        self.max_sleep = max_sleep
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the worker inside the running event loop; it runs the job once right away"""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def notify(self):
+        """Wake the worker now; safe to call from any thread, a no-op before start()"""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _seconds_until_due(self) -> float:
+        sleep = self.max_sleep.total_seconds()
+        if self.next_due is None:
+            return sleep
+        try:
+            due = self.next_due()
+        except Exception as e:
+            print(f"Error computing next run of {self.name}: {e}")
+            return sleep
+        if due is None:
+            return sleep
+        if due.tzinfo is not None:
+            due = due.astimezone(timezone.utc).replace(tzinfo=None)
+        # Never spin: wait at least a second even if something is already overdue
+        return min(sleep, max(1.0, (due - datetime.utcnow()).total_seconds()))
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                await self.job()
+            except Exception as e:
+                print(f"Error running {self.name}: {e}")
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._seconds_until_due())
+            except asyncio.TimeoutError:
+                pass
+
+
+def _claim_due_followups(limit: int) -> List[FollowUp]:
+    """
+    Claim a batch of due follow-ups and load everything needed to send them
+
+    The rows are locked with FOR UPDATE SKIP LOCKED only long enough to stamp
+    claimed_at, so two replicas never pick the same follow-up and no lock is
+    held while messages are generated and sent. A claim older than
+    followup_claim_timeout_minutes is considered abandoned and can be
+    re-claimed. The message, connection, profile and message history are
+    eager-loaded and returned detached.
+    """
+    db: Session = SessionLocal(expire_on_commit=False)
     try:
-        # Get all pending follow-ups that are due
         now = datetime.utcnow()
-        pending_followups = db.query(FollowUp).filter(
+        abandoned_before = now - timedelta(minutes=settings.followup_claim_timeout_minutes)
+        followup_ids = [
+            followup_id for (followup_id,) in db.query(FollowUp.id).filter(
+                FollowUp.status == FollowUpStatus.PENDING,
+                FollowUp.scheduled_at <= now,
+                or_(FollowUp.claimed_at.is_(None), FollowUp.claimed_at < abandoned_before)
+            ).order_by(FollowUp.scheduled_at).limit(limit).with_for_update(skip_locked=True).all()
+        ]
+        if not followup_ids:
+            db.commit()
+            return []
+
+        db.query(FollowUp).filter(FollowUp.id.in_(followup_ids)).update(
+            {FollowUp.claimed_at: now}, synchronize_session=False
+        )
+        db.commit()
+
+        connection_loader = selectinload(FollowUp.message).selectinload(Message.connection)
+        return db.query(FollowUp).options(
+            connection_loader.selectinload(Connection.profile),
+            connection_loader.selectinload(Connection.messages),
+        ).filter(FollowUp.id.in_(followup_ids)).order_by(FollowUp.scheduled_at).all()
+    finally:
+        db.close()
+
+
+def _record_followup_result(followup_id: int, status: FollowUpStatus, connection_id: Optional[int] = None, content: Optional[str] = None):
+    """Write the outcome of one follow-up, and the sent message if any, in a single transaction"""
+    with session_scope() as db:
+        values = {FollowUp.status: status}
+        if content is not None:
+            db.add(Message(
+                connection_id=connection_id,
+                content=content,
+                message_type=MessageType.FOLLOWUP
+            ))
+            values[FollowUp.sent_at] = datetime.utcnow()
+        db.query(FollowUp).filter(FollowUp.id == followup_id).update(values, synchronize_session=False)
+
+
+def _next_followup_due() -> Optional[datetime]:
+    """
+    When the follow-up dispatcher next has work: the earliest unclaimed
+    scheduled_at, or the moment the oldest claim is considered abandoned
+    """
+    db: Session = SessionLocal()
+    try:
+        next_scheduled = db.query(func.min(FollowUp.scheduled_at)).filter(
             FollowUp.status == FollowUpStatus.PENDING,
-            FollowUp.scheduled_at <= now
-        ).all()
+            FollowUp.claimed_at.is_(None)
+        ).scalar()
+        oldest_claim = db.query(func.min(FollowUp.claimed_at)).filter(
+            FollowUp.status == FollowUpStatus.PENDING,
+            FollowUp.claimed_at.isnot(None)
+        ).scalar()
+    finally:
+        db.close()
 
-        for followup in pending_followups:
+    candidates = [next_scheduled]
+    if oldest_claim is not None:
+        candidates.append(oldest_claim + timedelta(minutes=settings.followup_claim_timeout_minutes))
+    candidates = [
+        due.astimezone(timezone.utc).replace(tzinfo=None) if due.tzinfo is not None else due
+        for due in candidates if due is not None
+    ]
+    return min(candidates) if candidates else None
+
+
+async def process_pending_followups():
+    """Process all pending follow-ups that are due, one claimed batch at a time"""
+    while True:
+        batch = _claim_due_followups(settings.followup_batch_size)
+        if not batch:
+            return
+
+        for followup in batch:
+            trace = StageTrace("followup", followup_id=followup.id)
             try:
-                message = followup.message
-                connection = message.connection
+                connection = followup.message.connection
+                trace.connection_id = connection.id
 
                 if connection.status != ConnectionStatus.CONNECTED:
-                    followup.status = FollowUpStatus.CANCELLED
-                    db.commit()
+                    with trace.stage("record_result") as stage:
+                        stage.outcome = "cancelled"
+                        _record_followup_result(followup.id, FollowUpStatus.CANCELLED)
                     continue
 
-                # Get previous messages for context
-                previous_messages = db.query(Message).filter(
-                    Message.connection_id == connection.id
-                ).order_by(Message.sent_at).all()
+                # Previous messages give the generator context
+                previous_messages = sorted(connection.messages, key=lambda message: message.sent_at)
 
                 # Generate follow-up message
-                followup_content = message_generator.generate_followup_message(
-                    connection.profile,
-                    previous_messages
-                )
+                with trace.stage("generate_followup_message"):
+                    followup_content = message_generator.generate_followup_message(
+                        connection.profile,
+                        previous_messages
+                    )
 
                 # Send message
-                await asyncio.sleep(settings.rate_limit_delay)
-                success = await linkedin_service.send_message(
-                    connection.profile.linkedin_url,
-                    followup_content
-                )
-
-                if success:
-                    # Create new message record
-                    new_message = Message(
-                        connection_id=connection.id,
-                        content=followup_content,
-                        message_type=MessageType.FOLLOWUP
+                with trace.stage("pacing"):
+                    await asyncio.sleep(settings.rate_limit_delay)
+                with trace.stage("send_message") as stage:
+                    success = await browser_executor.submit(
+                        "send_message",
+                        linkedin_service.send_message,
+                        connection.profile.linkedin_url,
+                        followup_content,
+                        priority=ActionPriority.SCHEDULED,
                     )
-                    db.add(new_message)
-                    db.commit()
-                    db.refresh(new_message)
-
-                    # Update follow-up status
-                    followup.status = FollowUpStatus.SENT
-                    followup.sent_at = datetime.utcnow()
-                    db.commit()
-                else:
-                    followup.status = FollowUpStatus.FAILED
-                    db.commit()
+                    stage.outcome = "ok" if success else "failed"
+
+                with trace.stage("record_result"):
+                    if success:
+                        _record_followup_result(followup.id, FollowUpStatus.SENT, connection.id, followup_content)
+                    else:
+                        _record_followup_result(followup.id, FollowUpStatus.FAILED)
 
             except Exception as e:
                 print(f"Error processing follow-up {followup.id}: {e}")
-                followup.status = FollowUpStatus.FAILED
-                db.commit()
-
-    finally:
-        db.close()
+                _record_followup_result(followup.id, FollowUpStatus.FAILED)
+            finally:
+                trace.flush()
 
 
 async def schedule_followups_for_new_connections():
-    """Schedule follow-ups for newly connected profiles"""
+    """
+    Schedule follow-ups for newly connected profiles
+
+    A single INSERT ... SELECT ... WHERE NOT EXISTS covers every connected
+    connection whose initial message has no follow-up yet, so the job costs
+    one statement whatever the table sizes. The unique index on
+    followups.message_id guards against concurrent runs.
+    """
     db: Session = SessionLocal()
     try:
-        # Find connections that have initial messages but no scheduled follow-up
-        connections = db.query(Connection).join(Message).filter(
+        followup_date = datetime.utcnow() + timedelta(days=settings.followup_days)
+        new_followups = select(
+            Connection.connection_message_id,
+            literal(followup_date, FollowUp.scheduled_at.type),
+            literal(FollowUpStatus.PENDING, FollowUp.status.type),
+        ).join(
+            Message, Message.id == Connection.connection_message_id
+        ).where(
             Connection.status == ConnectionStatus.CONNECTED,
             Message.message_type == MessageType.INITIAL,
-            Message.id == Connection.connection_message_id
-        ).all()
-
-        for connection in connections:
-            # Check if follow-up already scheduled
-            existing_followup = db.query(FollowUp).filter(
-                FollowUp.message_id == connection.connection_message_id
-            ).first()
-
-            if not existing_followup:
-                # Schedule follow-up
-                followup_date = datetime.utcnow() + timedelta(days=settings.followup_days)
-                followup = FollowUp(
-                    message_id=connection.connection_message_id,
-                    scheduled_at=followup_date,
-                    status=FollowUpStatus.PENDING
-                )
-                db.add(followup)
-                db.commit()
+            ~exists().where(FollowUp.message_id == Connection.connection_message_id)
+        )
+        scheduled = insert_from_select_ignore_conflicts(
+            db,
+            FollowUp,
+            ['message_id', 'scheduled_at', 'status'],
+            new_followups,
+            index_elements=['message_id'],
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    if scheduled:
+        print(f"Scheduled {scheduled} follow-ups for new connections")
+        followup_worker.notify()
+
+
+async def sync_connection_acceptances():
+    """
+    Mark pending connections as connected once LinkedIn shows them accepted
 
+    Instead of visiting each pending profile, read LinkedIn's own lists:
+    invitations still in the sent-invitations manager are not accepted yet,
+    and the remaining candidates are looked up in the connections list. The
+    cost is a few page loads and one bulk UPDATE, whatever the pending count.
+    """
+    db: Session = SessionLocal()
+    try:
+        pending_urls = {
+            normalize_profile_url(url) for (url,) in db.query(Profile.linkedin_url).join(Connection).filter(
+                Connection.status == ConnectionStatus.PENDING
+            ).all()
+        }
+        pending_urls.discard(None)
+    finally:
+        db.close()
+
+    if not pending_urls:
+        return
+
+    still_pending = await browser_executor.submit(
+        "scrape_sent_invitations",
+        linkedin_service.scrape_sent_invitations,
+        max_pages=settings.acceptance_sync_max_pages,
+        priority=ActionPriority.SCHEDULED,
+    )
+    candidates = pending_urls - still_pending
+    if not candidates:
+        return
+
+    connected = await browser_executor.submit(
+        "scrape_connections",
+        linkedin_service.scrape_connections,
+        candidates,
+        max_pages=settings.acceptance_sync_max_pages,
+        priority=ActionPriority.SCHEDULED,
+    )
+    accepted = candidates & connected
+    if not accepted:
+        return
+
+    db = SessionLocal()
+    try:
+        # Stored URLs may or may not keep LinkedIn's trailing slash
+        url_variants = accepted | {f"{url}/" for url in accepted}
+        updated = db.query(Connection).filter(
+            Connection.status == ConnectionStatus.PENDING,
+            Connection.profile_id.in_(select(Profile.id).where(Profile.linkedin_url.in_(url_variants)))
+        ).update(
+            {Connection.status: ConnectionStatus.CONNECTED, Connection.connected_at: func.now()},
+            synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"Acceptance sync: {updated} pending connections are now connected")
+    if updated:
+        followup_scheduling_worker.notify()
+
+
+async def sync_inbox_replies():
+    """
+    Record replies from the messaging inbox and cancel follow-ups for those who replied
+
+    The inbox list is walked once and every thread is extracted in a single
+    evaluate, then stored with one bulk upsert, so the cost grows with the
+    number of threads rather than the number of profiles.
+    """
+    threads = await browser_executor.submit(
+        "scrape_inbox",
+        linkedin_service.scrape_inbox,
+        max_threads=settings.inbox_sync_max_threads,
+        priority=ActionPriority.SCHEDULED,
+    )
+    if not threads:
+        return
+
+    db: Session = SessionLocal()
+    try:
+        # Only rewrite a thread when its last inbound message changed
+        upsert(
+            db,
+            InboundMessage,
+            threads,
+            index_elements=['thread_url'],
+            update_columns=['profile_url', 'participant_name', 'snippet', 'last_inbound_at'],
+            where=lambda excluded: InboundMessage.snippet.is_distinct_from(excluded.snippet),
+        )
+
+        # Attach new threads to connections by profile URL; thread URLs are normalized
+        # without the trailing slash, stored profile URLs may keep it
+        url_match = select(Connection.id).join(Profile).where(
+            Profile.linkedin_url.in_([InboundMessage.profile_url, InboundMessage.profile_url + '/'])
+        ).order_by(Connection.id.desc()).limit(1).scalar_subquery()
+        db.query(InboundMessage).filter(
+            InboundMessage.connection_id.is_(None)
+        ).update({InboundMessage.connection_id: url_match}, synchronize_session=False)
+
+        # Fall back to the participant name only when it names exactly one profile, and
+        # that profile has no thread of its own by URL: display names are not unique
+        unique_names = select(Profile.name).group_by(Profile.name).having(func.count(Profile.id) == 1)
+        other_thread = aliased(InboundMessage)
+        name_match = select(Connection.id).join(Profile).where(
+            Profile.name == InboundMessage.participant_name,
+            Profile.name.in_(unique_names),
+            ~exists().where(other_thread.profile_url == func.rtrim(Profile.linkedin_url, '/')),
+        ).order_by(Connection.id.desc()).limit(1).scalar_subquery()
+        db.query(InboundMessage).filter(
+            InboundMessage.connection_id.is_(None)
+        ).update({InboundMessage.connection_id: name_match}, synchronize_session=False)
+
+        # Anyone who replied to our message gets a conversation, not an automated follow-up;
+        # an older thread with the same person is not a reply
+        replied_since_sent = exists().where(
+            InboundMessage.connection_id == Message.connection_id,
+            InboundMessage.last_inbound_at > Message.sent_at,
+        )
+        cancelled = db.query(FollowUp).filter(
+            FollowUp.status == FollowUpStatus.PENDING,
+            FollowUp.message_id.in_(select(Message.id).where(replied_since_sent))
+        ).update({FollowUp.status: FollowUpStatus.CANCELLED}, synchronize_session=False)
+        db.commit()
     finally:
         db.close()
 
+    print(f"Inbox sync: {len(threads)} inbound threads, {cancelled} follow-ups cancelled")
+
+
+# Sends follow-ups when the earliest one is due; woken when new ones are scheduled
+followup_worker = DueTimeWorker(
+    "process_followups",
+    process_pending_followups,
+    next_due=_next_followup_due,
+    max_sleep=timedelta(minutes=settings.followup_max_sleep_minutes),
+)
+
+# Schedules follow-ups whenever a connection becomes connected; the long sleep is only a safety net
+followup_scheduling_worker = DueTimeWorker(
+    "schedule_followups",
+    schedule_followups_for_new_connections,
+    max_sleep=timedelta(hours=6),
+)
+
+
+def _connection_slots_left(db: Session) -> int:
+    """Connection requests still allowed today under max_connections_per_day"""
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    used = db.query(Connection).filter(
+        Connection.created_at >= today,
+        Connection.status.in_([ConnectionStatus.CONNECTED, ConnectionStatus.CONNECTING, ConnectionStatus.PENDING])
+    ).count()
+    return settings.max_connections_per_day - used
+
+
+def _next_retry_due() -> Optional[datetime]:
+    """The earliest scheduled connection retry, or tomorrow when today's quota is spent"""
+    db: Session = SessionLocal()
+    try:
+        next_attempt = db.query(func.min(Connection.next_attempt_at)).filter(
+            Connection.status == ConnectionStatus.FAILED,
+            Connection.next_attempt_at.isnot(None)
+        ).scalar()
+        if next_attempt is not None and _connection_slots_left(db) <= 0:
+            return datetime.combine(datetime.utcnow().date() + timedelta(days=1), datetime.min.time())
+        return next_attempt
+    finally:
+        db.close()
+
+
+async def retry_failed_connections():
+    """
+    Retry connections whose transient failure has reached its next_attempt_at
+
+    The due rows are found with the (status, next_attempt_at) index and their
+    next_attempt_at is cleared before the attempt, so a retry is never picked
+    twice; a new failure schedules the next one with a longer backoff.
+    """
+    # Imported here because the connections API imports this module
+    from app.api.connections import process_connection
+
+    db: Session = SessionLocal()
+    try:
+        slots_left = _connection_slots_left(db)
+        if slots_left <= 0:
+            return
+        due = db.query(Connection.id, Connection.profile_id).filter(
+            Connection.status == ConnectionStatus.FAILED,
+            Connection.next_attempt_at <= datetime.utcnow()
+        ).order_by(Connection.next_attempt_at).limit(slots_left).all()
+        if not due:
+            return
+        db.query(Connection).filter(Connection.id.in_([connection_id for connection_id, _ in due])).update(
+            {Connection.next_attempt_at: None}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    print(f"Retrying {len(due)} failed connections")
+    for _, profile_id in due:
+        await process_connection(profile_id)
+        await asyncio.sleep(settings.rate_limit_delay)
+
+
+# Retries transient connection failures when their backoff expires
+connection_retry_worker = DueTimeWorker(
+    "retry_connections",
+    retry_failed_connections,
+    next_due=_next_retry_due,
+    max_sleep=timedelta(hours=1),
+)
+
 
 def start_scheduler():
     """Start the background scheduler"""
-    # Schedule follow-up processing every hour
+    global scheduler
+    from apscheduler.schedulers.asyncio import AsyncIOScheduler
+    from apscheduler.triggers.interval import IntervalTrigger
+
+    scheduler = AsyncIOScheduler()
+    followup_worker.start()
+    followup_scheduling_worker.start()
+    connection_retry_worker.start()
+
+    # Detect accepted invitations from LinkedIn's sent-invitations and connections lists
     scheduler.add_job(
-        process_pending_followups,
-        trigger=IntervalTrigger(hours=1),
-        id="process_followups",
-        replace_existing=True
+        timed_job("sync_acceptances", sync_connection_acceptances),
+        trigger=IntervalTrigger(minutes=settings.acceptance_sync_interval_minutes),
+        id="sync_acceptances",
+        replace_existing=True,
+        coalesce=True,
+        max_instances=1
     )
 
-    # Schedule follow-up creation check every 6 hours
+    # Capture replies from the messaging inbox
     scheduler.add_job(
-        schedule_followups_for_new_connections,
-        trigger=IntervalTrigger(hours=6),
-        id="schedule_followups",
-        replace_existing=True
+        timed_job("sync_inbox", sync_inbox_replies),
+        trigger=IntervalTrigger(minutes=settings.inbox_sync_interval_minutes),
+        id="sync_inbox",
+        replace_existing=True,
+        coalesce=True,
+        max_instances=1
     )
 
     # Start scheduler
@@ -137,5 +575,11 @@ def start_scheduler():
 
 def stop_scheduler():
     """Stop the scheduler"""
-    scheduler.stop()
+    global scheduler
+    followup_worker.stop()
+    followup_scheduling_worker.stop()
+    connection_retry_worker.stop()
+    if scheduler is not None:
+        scheduler.shutdown(wait=False)
+        scheduler = None
 
@@ -0,0 +1,122 @@
+from datetime import datetime
+from typing import List, Set
+from app.database import SessionLocal, session_scope, insert_ignore_conflicts
+from app.models.profile import Profile
+from app.models.scrape_job import ScrapeJob, ScrapeJobStatus
+from app.services.linkedin import linkedin_service
+from app.services.browser_executor import browser_executor, ActionPriority
+from app.services.leader import leader
+
+# Jobs with a running task in this process, so a resume request can't start a second one
+_running_jobs: Set[int] = set()
+
+
+def _save_profiles(scraped_profiles: List[dict]) -> int:
+    """Insert one page of scraped profiles in a single statement, skipping known URLs"""
+    rows = []
+    seen = set()
+    for profile_data in scraped_profiles:
+        linkedin_url = profile_data.get('linkedin_url')
+        if not linkedin_url or linkedin_url in seen:
+            continue
+        seen.add(linkedin_url)
+        rows.append({
+            'linkedin_url': linkedin_url,
+            'name': profile_data.get('name') or 'Unknown',
+            'company': profile_data.get('company'),
+            'title': profile_data.get('title'),
+        })
+
+    with session_scope() as db:
+        return insert_ignore_conflicts(db, Profile, rows, index_elements=['linkedin_url'])
+
+
+def _update_job(job_id: int, **values):
+    """Write progress or a final status to the job row"""
+    with session_scope() as db:
+        db.query(ScrapeJob).filter(ScrapeJob.id == job_id).update(values)
+
+
+async def run_scrape_job(job_id: int):
+    """
+    Scrape a search job page by page, persisting each page as it goes
+
+    The job row is the resume cursor: next_page and the counters are written
+    after every page, so a failed or interrupted job continues where it left
+    off instead of starting over.
+    """
+    if job_id in _running_jobs:
+        return
+    _running_jobs.add(job_id)
+    try:
+        db = SessionLocal()
+        try:
+            job = db.query(ScrapeJob).filter(ScrapeJob.id == job_id).first()
+            if not job or job.status == ScrapeJobStatus.COMPLETED:
+                return
+            job.status = ScrapeJobStatus.RUNNING
+            job.error = None
+            db.commit()
+            search_url = job.search_url
+            max_results = job.max_results
+            page_number = job.next_page
+            profiles_found = job.profiles_found
+            profiles_created = job.profiles_created
+        finally:
+            db.close()
+
+        try:
+            while profiles_found < max_results:
+                # Each page is its own browser action so interactive work can run in between
+                page_profiles, has_more = await browser_executor.submit(
+                    "scrape_search_results_page",
+                    linkedin_service.scrape_search_results_page,
+                    search_url,
+                    page_number,
+                    max_results=max_results - profiles_found,
+                    priority=ActionPriority.BULK,
+                )
+                profiles_created += _save_profiles(page_profiles)
+                profiles_found += len(page_profiles)
+                page_number += 1
+                _update_job(
+                    job_id,
+                    next_page=page_number,
+                    profiles_found=profiles_found,
+                    profiles_created=profiles_created,
+                )
+                if not page_profiles or not has_more:
+                    break
+
+            _update_job(job_id, status=ScrapeJobStatus.COMPLETED, finished_at=datetime.utcnow())
+            print(f"Scrape job {job_id} completed: {profiles_created} new profiles out of {profiles_found} found")
+        except Exception as e:
+            print(f"Error running scrape job {job_id}: {e}")
+            _update_job(job_id, status=ScrapeJobStatus.FAILED, error=str(e)[:500])
+    finally:
+        _running_jobs.discard(job_id)
+
+
+def start_scrape_job(job_id: int):
+    """Run a scrape job in the background on the leader worker"""
+    leader.dispatch("run_scrape_job", job_id=job_id)
+
+
+leader.register_task("run_scrape_job", run_scrape_job)
+
+
+def resume_interrupted_scrape_jobs():
+    """Restart jobs that were queued or running when the process stopped"""
+    db = SessionLocal()
+    try:
+        job_ids = [
+            job_id for (job_id,) in db.query(ScrapeJob.id).filter(
+                ScrapeJob.status.in_([ScrapeJobStatus.QUEUED, ScrapeJobStatus.RUNNING])
+            ).all()
+        ]
+    finally:
+        db.close()
+
+    for job_id in job_ids:
+        print(f"Resuming interrupted scrape job {job_id}")
+        start_scrape_job(job_id)
@@ -0,0 +1,67 @@
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Optional
+from app.database import session_scope
+from app.models.stage_timing import StageTiming
+
+
+class StageRecord:
+    """A stage being timed; set outcome to report something other than ok/error"""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.outcome: Optional[str] = None
+
+
+class StageTrace:
+    """
+    Time the stages of one pipeline run and persist them together
+
+    Stages are buffered in memory and written with one INSERT when the run
+    calls flush(), so tracing adds no database round trip per stage and no
+    session is held while the stages themselves run.
+    """
+
+    def __init__(self, pipeline: str, connection_id: Optional[int] = None, followup_id: Optional[int] = None):
+        self.pipeline = pipeline
+        self.run_id = uuid.uuid4().hex
+        self.connection_id = connection_id
+        self.followup_id = followup_id
+        self._rows: List[dict] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageRecord]:
+        record = StageRecord(name)
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException:
+            record.outcome = record.outcome or "error"
+            raise
+        finally:
+            self._rows.append({
+                'stage': name,
+                'outcome': record.outcome or "ok",
+                'started_at': started_at,
+                'finished_at': datetime.utcnow(),
+                'duration_ms': (time.perf_counter() - start) * 1000,
+            })
+
+    def flush(self):
+        """Append the buffered stages to stage_timings; tracing failures never break the pipeline"""
+        if not self._rows:
+            return
+        rows = [
+            dict(row, pipeline=self.pipeline, run_id=self.run_id,
+                 connection_id=self.connection_id, followup_id=self.followup_id)
+            for row in self._rows
+        ]
+        self._rows = []
+        try:
+            with session_scope() as db:
+                db.bulk_insert_mappings(StageTiming, rows)
+        except Exception as e:
+            print(f"Error saving stage timings for {self.pipeline} run {self.run_id}: {e}")
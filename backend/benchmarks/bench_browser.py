@@ -0,0 +1,225 @@
+"""
+Time LinkedInService actions end to end against the local fake LinkedIn
+
+    python -m benchmarks.bench_browser --latency-ms 150 --repeat 3
+
+Starts benchmarks.fake_linkedin on a free port and drives a real headless
+Chromium through LinkedInService. For every action it reports the wall
+time, the time spent in the service's fixed asyncio.sleep pauses, the
+Playwright IPC calls (messages sent to the Playwright driver) and the HTTP
+requests the fake server received, all per run. --skip-sleeps turns the
+pauses into no-ops so the numbers show the automation cost alone.
+
+Needs playwright and its Chromium (playwright install chromium). No
+database is touched. Each action's return value is checked, so a selector
+the fixtures no longer satisfy shows up as an error instead of a timing.
+"""
+import argparse
+import asyncio
+import fnmatch
+import os
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import use_backend, summarize, write_results, print_table
+from benchmarks.fake_linkedin import FakeLinkedIn
+
+IPC_METHODS = ("send", "send_return_as_dict", "send_may_fail", "send_no_reply")
+
+
+class Instrumentation:
+    """Count Playwright IPC calls and the service's pacing sleeps while installed"""
+
+    def __init__(self, skip_sleeps: bool):
+        self.skip_sleeps = skip_sleeps
+        self.ipc_calls = 0
+        self.ipc_by_method: Counter = Counter()
+        self.sleep_seconds = 0.0
+
+    def reset(self):
+        self.ipc_calls = 0
+        self.ipc_by_method = Counter()
+        self.sleep_seconds = 0.0
+
+    def install(self):
+        # Every Page/ElementHandle/BrowserContext call goes through Channel.send*
+        from playwright._impl._connection import Channel
+        import app.services.linkedin as linkedin_module
+
+        instrumentation = self
+        for name in IPC_METHODS:
+            original = getattr(Channel, name, None)
+            if original is None:
+                continue
+
+            def counted(channel, method, *args, _original=original, **kwargs):
+                instrumentation.ipc_calls += 1
+                instrumentation.ipc_by_method[method] += 1
+                return _original(channel, method, *args, **kwargs)
+
+            setattr(Channel, name, counted)
+        linkedin_module.asyncio = _PacingRecorder(self)
+
+
+class _PacingRecorder:
+    """Stands in for the asyncio module inside app.services.linkedin to record (or skip) its pauses"""
+
+    def __init__(self, instrumentation: Instrumentation):
+        self._instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        return getattr(asyncio, name)
+
+    async def sleep(self, delay, result=None):
+        self._instrumentation.sleep_seconds += delay
+        return await asyncio.sleep(0 if self._instrumentation.skip_sleeps else delay, result)
+
+
+def _cases(base_url: str, max_results: int) -> List[Dict[str, Any]]:
+    """Actions to time, with a check that the fixtures were understood"""
+    def expect(condition: bool, message: str):
+        if not condition:
+            raise AssertionError(message)
+
+    return [
+        {
+            "name": "scrape_profile_details",
+            "run": lambda service: service.scrape_profile_details(f"{base_url}/in/bench-1"),
+            "check": lambda result: expect(result.get("name") and result.get("current_company"), f"incomplete profile: {result}"),
+        },
+        {
+            "name": "send_connection_request",
+            "run": lambda service: service.send_connection_request(f"{base_url}/in/bench-2", "Hi, let's connect!"),
+            "check": lambda result: expect(result == (True, None), f"unexpected result: {result}"),
+        },
+        {
+            "name": "scrape_search_results",
+            "run": lambda service: service.scrape_search_results(
+                f"{base_url}/search/results/people/?keywords=bench", max_results=max_results
+            ),
+            "check": lambda result: expect(len(result) == max_results, f"{len(result)} of {max_results} profiles"),
+        },
+        {
+            "name": "send_message",
+            "run": lambda service: service.send_message(f"{base_url}/in/connected-1", "Thanks for connecting!"),
+            "check": lambda result: expect(result is True, "message not sent"),
+        },
+        {
+            "name": "scrape_inbox",
+            "run": lambda service: service.scrape_inbox(max_threads=50),
+            "check": lambda result: expect(len(result) > 0, "no inbound threads"),
+        },
+    ]
+
+
+async def _measure(
+    service,
+    fake: FakeLinkedIn,
+    instrumentation: Instrumentation,
+    run: Callable,
+    check: Callable,
+    repeat: int,
+) -> Dict[str, Any]:
+    """Time repeat runs of one action after a warmup run, checking every result"""
+    check(await run(service))
+
+    timings, ipc_calls, sleep_ms, http_requests = [], [], [], []
+    methods: Counter = Counter()
+    for _ in range(repeat):
+        instrumentation.reset()
+        requests_before = fake.requests
+        start = time.perf_counter()
+        result = await run(service)
+        timings.append((time.perf_counter() - start) * 1000)
+        check(result)
+        ipc_calls.append(instrumentation.ipc_calls)
+        sleep_ms.append(instrumentation.sleep_seconds * 1000)
+        http_requests.append(fake.requests - requests_before)
+        methods.update(instrumentation.ipc_by_method)
+
+    summary = summarize(timings)
+    wall_ms = summary["mean_ms"]
+    summary.update({
+        "ipc_calls": sum(ipc_calls) / repeat,
+        "sleep_ms": round(sum(sleep_ms) / repeat, 3),
+        "active_ms": round(wall_ms - (0 if instrumentation.skip_sleeps else sum(sleep_ms) / repeat), 3),
+        "http_requests": sum(http_requests) / repeat,
+        "ipc_by_method": {method: count / repeat for method, count in methods.most_common()},
+    })
+    return summary
+
+
+async def run_benchmarks(args) -> List[Dict[str, Any]]:
+    from app.services.linkedin import LinkedInService
+
+    fake = FakeLinkedIn(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        results_per_page=args.results_per_page,
+        search_pages=args.search_pages,
+    )
+    base_url = fake.start()
+    instrumentation = Instrumentation(args.skip_sleeps)
+    instrumentation.install()
+
+    service = LinkedInService(base_url=base_url)
+    # Keep the benchmark session away from the real one
+    service.cookies_file = Path(tempfile.mkdtemp(prefix="bench-browser-")) / "cookies.json"
+
+    results = []
+    try:
+        instrumentation.reset()
+        start = time.perf_counter()
+        await service.login("bench@example.com", "bench")
+        print(f"Logged in to {base_url} in {(time.perf_counter() - start) * 1000:.0f} ms ({instrumentation.ipc_calls} IPC calls)")
+
+        for case in _cases(base_url, args.max_results):
+            if args.only and not any(fnmatch.fnmatch(case["name"], pattern) for pattern in args.only):
+                continue
+            print(f"Running {case['name']}...")
+            try:
+                measured = await _measure(service, fake, instrumentation, case["run"], case["check"], args.repeat)
+                results.append({"name": case["name"], **measured})
+            except Exception as e:
+                results.append({"name": case["name"], "error": str(e)[:500]})
+    finally:
+        await service.close()
+        fake.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per action")
+    parser.add_argument("--only", action="append", help="Glob of action names to run; repeatable")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay the fake server adds to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra delay, up to this much")
+    parser.add_argument("--results-per-page", type=int, default=10)
+    parser.add_argument("--search-pages", type=int, default=3)
+    parser.add_argument("--max-results", type=int, default=25, help="Profiles scrape_search_results collects")
+    parser.add_argument("--skip-sleeps", action="store_true", help="Make the service's fixed pauses no-ops")
+    parser.add_argument("--output", help="JSON results file (default: benchmarks/results/browser-<time>-<rev>.json)")
+    args = parser.parse_args()
+
+    # Settings require a database URL even though this suite never connects
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    use_backend()
+
+    results = asyncio.run(run_benchmarks(args))
+    print_table(results, extra=("ipc_calls", "sleep_ms", "http_requests"))
+    context = {
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "results_per_page": args.results_per_page,
+        "search_pages": args.search_pages,
+        "max_results": args.max_results,
+        "skip_sleeps": args.skip_sleeps,
+    }
+    write_results("browser", results, context, args.output)
+
+
+if __name__ == "__main__":
+    main()
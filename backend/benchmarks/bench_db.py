@@ -0,0 +1,100 @@
+"""
+Time the database paths behind the dashboard endpoints and scheduler jobs
+
+    python -m benchmarks.bench_db --database-url postgresql://.../linkedin_bench
+
+Run it against a database filled by benchmarks.seed. The endpoint functions
+are called directly with a session, so the timings cover the real ORM
+queries and response building without HTTP overhead. Results are printed
+and written as JSON to benchmarks/results/ (or --output).
+
+The scheduler benchmarks write to the database (follow-ups get scheduled
+and claimed), so reseed before comparing runs.
+"""
+import argparse
+import asyncio
+import fnmatch
+from typing import Any, Callable, Dict, List
+
+from benchmarks.common import use_database, measure, write_results, print_table
+
+
+def _cases(repeat: int) -> List[Dict[str, Any]]:
+    """Benchmark cases, built after use_database() so the app binds to the benchmark database"""
+    from app.api.profiles import get_profiles
+    from app.api.connections import get_connections
+    from app.api.messages import get_messages
+    from app.api.stats import get_stats
+    from app.services import scheduler
+
+    def run_job(job: Callable):
+        return lambda db: asyncio.run(job())
+
+    # Full-table listings have no pagination; they run once so a large dataset stays tractable
+    return [
+        {"name": "get_profiles (first page)", "run": lambda db: get_profiles(skip=0, limit=100, status=None, company=None, db=db), "repeat": repeat},
+        {"name": "get_profiles (deep page)", "run": lambda db: get_profiles(skip=500_000, limit=100, status=None, company=None, db=db), "repeat": repeat},
+        {"name": "get_profiles (company filter)", "run": lambda db: get_profiles(skip=0, limit=100, status=None, company="Company 42", db=db), "repeat": repeat},
+        {"name": "get_connections (failed)", "run": lambda db: get_connections(status="failed", db=db), "repeat": 1},
+        {"name": "get_connections (all)", "run": lambda db: get_connections(status=None, db=db), "repeat": 1},
+        {"name": "get_messages (one connection)", "run": lambda db: get_messages(connection_id=1, message_type=None, db=db), "repeat": repeat},
+        {"name": "get_messages (all)", "run": lambda db: get_messages(connection_id=None, message_type=None, db=db), "repeat": 1},
+        {"name": "get_stats", "run": lambda db: get_stats(db=db), "repeat": repeat},
+        {"name": "daily limit count", "run": lambda db: scheduler._connection_slots_left(db), "repeat": repeat},
+        {"name": "next follow-up due", "run": lambda db: scheduler._next_followup_due(), "repeat": repeat},
+        {"name": "schedule_followups_for_new_connections", "run": run_job(scheduler.schedule_followups_for_new_connections), "repeat": repeat},
+        {"name": "claim due follow-ups", "run": lambda db: scheduler._claim_due_followups(scheduler.settings.followup_batch_size), "repeat": repeat},
+    ]
+
+
+def count_rows(db) -> Dict[str, int]:
+    from sqlalchemy import text
+    return {
+        table: db.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+        for table in ("profiles", "connections", "messages", "followups", "inbound_messages")
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Seeded benchmark database (defaults to DATABASE_URL)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument("--only", action="append", help="Glob of benchmark names to run; repeatable")
+    parser.add_argument("--output", help="JSON results file (default: benchmarks/results/db-<time>-<rev>.json)")
+    args = parser.parse_args()
+
+    use_database(args.database_url)
+    from app.database import SessionLocal, engine
+
+    db = SessionLocal()
+    try:
+        dataset = count_rows(db)
+    finally:
+        db.close()
+    print(f"Dataset: {dataset}")
+
+    results = []
+    for case in _cases(args.repeat):
+        if args.only and not any(fnmatch.fnmatch(case["name"], pattern) for pattern in args.only):
+            continue
+
+        def run(case=case):
+            db = SessionLocal()
+            try:
+                case["run"](db)
+            finally:
+                db.close()
+
+        print(f"Running {case['name']}...")
+        try:
+            warmup = 1 if case["repeat"] > 1 else 0
+            results.append({"name": case["name"], **measure(run, repeat=case["repeat"], warmup=warmup)})
+        except Exception as e:
+            results.append({"name": case["name"], "error": str(e)[:500]})
+
+    print_table(results)
+    write_results("db", results, {"dialect": engine.dialect.name, "dataset": dataset}, args.output)
+
+
+if __name__ == "__main__":
+    main()
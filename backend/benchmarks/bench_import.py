@@ -0,0 +1,128 @@
+"""
+Time a cold import of the app and list the heavy dependencies it loads
+
+    python -m benchmarks.bench_import --repeat 5
+
+Every run imports the module in a fresh interpreter, so nothing is cached
+in sys.modules. It records the import wall time, the peak RSS of that
+interpreter, and which heavy dependencies (pandas, Playwright,
+cryptography, the Mistral SDK, APScheduler) got loaded. The heavy
+dependencies are also timed on their own, to show what loading them
+lazily saves. --importtime prints the slowest imports reported by
+python -X importtime for the app.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Any, Dict, List
+
+from benchmarks.common import BACKEND_DIR, use_backend, summarize, write_results, print_table
+
+# Modules the app should only load on first use
+HEAVY_MODULES = ("pandas", "playwright", "cryptography", "mistralai", "apscheduler")
+
+TARGETS = [
+    "app.main",
+    "app.api.profiles",
+    "app.services.linkedin",
+    "app.services.message_generator",
+    "app.services.scheduler",
+    "pandas",
+    "playwright.async_api",
+    "cryptography.fernet",
+    "mistralai",
+    "apscheduler.schedulers.asyncio",
+]
+
+# Runs in the child interpreter: import the target, report time, memory and loaded heavy modules
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{
+    "import_ms": elapsed,
+    "max_rss_mb": rss / 1024 if sys.platform != "darwin" else rss / 1024 / 1024,
+    "heavy_loaded": sorted(name for name in {heavy!r} if name in sys.modules),
+}}))
+"""
+
+
+def _probe(module: str, env: Dict[str, str]) -> Dict[str, Any]:
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else "import failed")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _measure_import(module: str, repeat: int, env: Dict[str, str]) -> Dict[str, Any]:
+    # The first run warms the OS file cache, like every start after the first
+    _probe(module, env)
+    runs = [_probe(module, env) for _ in range(repeat)]
+    return {
+        **summarize([run["import_ms"] for run in runs]),
+        "max_rss_mb": round(statistics.median(run["max_rss_mb"] for run in runs), 1),
+        "heavy_loaded": runs[-1]["heavy_loaded"],
+    }
+
+
+def _print_importtime(module: str, env: Dict[str, str], top: int = 20):
+    """Print the slowest imports by cumulative time, from python -X importtime"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    entries = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        self_us, cumulative_us, name = fields
+        entries.append((int(cumulative_us), int(self_us), name.strip()))
+    print(f"Slowest imports under {module} (cumulative ms, self ms):")
+    for cumulative_us, self_us, name in sorted(entries, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:>9.1f}  {self_us / 1000:>8.1f}  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module")
+    parser.add_argument("--only", action="append", help="Module to time instead of the defaults; repeatable")
+    parser.add_argument("--database-url", help="DATABASE_URL for the import (default: in-memory SQLite; nothing connects)")
+    parser.add_argument("--importtime", action="store_true", help="Also print python -X importtime's slowest imports of app.main")
+    parser.add_argument("--output", help="JSON results file (default: benchmarks/results/import-<time>-<rev>.json)")
+    args = parser.parse_args()
+
+    # Importing the app creates the engine but never connects
+    os.environ["DATABASE_URL"] = args.database_url or os.environ.get("DATABASE_URL") or "sqlite://"
+    use_backend()
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(BACKEND_DIR), os.environ.get("PYTHONPATH")]))}
+
+    results: List[Dict[str, Any]] = []
+    for module in args.only or TARGETS:
+        print(f"Importing {module}...")
+        try:
+            results.append({"name": module, **_measure_import(module, args.repeat, env)})
+        except Exception as e:
+            results.append({"name": module, "error": str(e)[:500]})
+
+    print_table(results, extra=("max_rss_mb",))
+    for result in results:
+        if result.get("heavy_loaded"):
+            print(f"{result['name']} loads {', '.join(result['heavy_loaded'])}")
+    if args.importtime:
+        _print_importtime("app.main", env)
+    write_results("import", results, {"heavy_modules": list(HEAVY_MODULES)}, args.output)
+
+
+if __name__ == "__main__":
+    main()
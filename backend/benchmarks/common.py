@@ -0,0 +1,112 @@
+"""
+Shared helpers for the benchmark scripts
+
+The app reads its settings when app.config is first imported, so every
+script calls use_database() (or use_backend() when it never touches the
+database) before importing anything from app.
+"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def use_backend():
+    """Make the backend importable without starting the scheduler or the browser"""
+    os.environ.setdefault("LEADER_ELECTION", "false")
+    os.environ.setdefault("BROWSER_PREWARM", "false")
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+
+
+def use_database(database_url: Optional[str]):
+    """Point the app at the benchmark database and make the backend importable"""
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
+    if not os.environ.get("DATABASE_URL"):
+        sys.exit("Set DATABASE_URL or pass --database-url")
+    use_backend()
+
+
+def measure(function: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> Dict[str, float]:
+    """Run function warmup + repeat times and summarise the timed runs in milliseconds"""
+    for _ in range(warmup):
+        function()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize(timings)
+
+
+def _nearest_rank(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """min/median/p95/p99/max/mean of timings in milliseconds"""
+    timings = sorted(timings)
+    return {
+        "runs": len(timings),
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(_nearest_rank(timings, 0.95), 3),
+        "p99_ms": round(_nearest_rank(timings, 0.99), 3),
+        "max_ms": round(timings[-1], 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(suite: str, results: List[Dict[str, Any]], context: Dict[str, Any], output: Optional[str] = None) -> Path:
+    """Store one run as JSON so runs of different versions can be diffed"""
+    revision = git_revision()
+    payload = {
+        "suite": suite,
+        "revision": revision,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "context": context,
+        "results": results,
+    }
+    if output:
+        path = Path(output)
+    else:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        path = RESULTS_DIR / f"{suite}-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}-{revision or 'unknown'}.json"
+    path.write_text(json.dumps(payload, indent=2) + "\n")
+    print(f"Results written to {path}")
+    return path
+
+
+def print_table(results: List[Dict[str, Any]], extra: Tuple[str, ...] = ()):
+    """Print median/p95 per benchmark, plus the numeric result keys listed in extra"""
+    width = max(len(result["name"]) for result in results) if results else 10
+    print(f"{'benchmark'.ljust(width)}  {'median ms':>10}  {'p95 ms':>10}  {'runs':>5}" + "".join(f"  {key:>12}" for key in extra))
+    for result in results:
+        if "error" in result:
+            print(f"{result['name'].ljust(width)}  error: {result['error']}")
+            continue
+        print(
+            f"{result['name'].ljust(width)}  {result['median_ms']:>10.1f}  {result['p95_ms']:>10.1f}  {result['runs']:>5}"
+            + "".join(f"  {result.get(key, 0):>12.1f}" for key in extra)
+        )
@@ -0,0 +1,372 @@
+"""
+A local stand-in for LinkedIn serving fixture pages with the selectors LinkedInService uses
+
+    python -m benchmarks.fake_linkedin --port 8765 --latency-ms 150
+
+Point the app at it with LINKEDIN_BASE_URL=http://127.0.0.1:8765. Pages:
+
+- /login            login form; any email works, the password "wrong" fails
+- /feed             the session check
+- /in/<slug>/       a profile with a Connect flow; slugs starting with
+                    "connected-" show the Message flow instead
+- /search/results/people/?page=N
+                    results rendered in batches as the window scrolls,
+                    with pagination over --search-pages pages
+- /messaging/       the inbox, loading more threads as its list scrolls
+- /mynetwork/invitation-manager/sent/, /mynetwork/invite-connect/connections/
+                    single-page lists for the scheduler's acceptance sync
+
+Every page except /login requires the li_at cookie set by logging in and
+redirects to /login otherwise, like LinkedIn's auth wall. Each response is
+delayed by --latency-ms (plus up to --jitter-ms) to mimic network latency.
+"""
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+SESSION_COOKIE = "li_at"
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title} | LinkedIn</title>
+<style>
+.reusable-search__result-container {{ height: 240px; }}
+.msg-conversations-container__conversations-list {{ height: 600px; overflow-y: auto; }}
+.msg-conversation-listitem {{ height: 90px; }}
+</style></head>
+<body>{body}</body></html>
+"""
+
+LOGIN_BODY = """
+<form method="post" action="/login">
+  {error}
+  <input type="text" name="session_key">
+  <input type="password" name="session_password">
+  <button type="submit">Sign in</button>
+</form>
+"""
+
+FEED_BODY = """
+<main class="scaffold-layout__main">
+  <div class="feed-identity-module">Bench User</div>
+  <div class="feed-shared-update-v2">Nothing new today.</div>
+</main>
+"""
+
+PROFILE_BODY = """
+<main>
+  <h1 class="text-heading-xlarge">{name}</h1>
+  <div class="text-body-medium break-words">{title} at {company}</div>
+  <span class="text-body-small inline t-black--light break-words">Paris, Île-de-France, France</span>
+  <div id="actions">{actions}</div>
+  <section><div id="about"></div><div class="pvs-list">{name} builds things at {company}.</div></section>
+  <section>
+    <div id="experience"></div>
+    <ul class="pvs-list">
+      <li class="pvs-list__item">
+        <div class="mr1 t-bold"><span aria-hidden="true">{title}</span></div>
+        <span class="t-14 t-normal"><span aria-hidden="true">{company}</span></span>
+      </li>
+    </ul>
+  </section>
+</main>
+"""
+
+# Like LinkedIn, the invitation modal and the message box only exist once opened
+CONNECT_ACTIONS = """
+<button id="connect" aria-label="Invite {name} to connect">Connect</button>
+<script>
+document.getElementById('connect').addEventListener('click', () => {{
+  const modal = document.createElement('div');
+  modal.className = 'artdeco-modal';
+  modal.innerHTML = '<p>Personalize your invitation</p><button id="add-note">Add a note</button>';
+  document.body.appendChild(modal);
+  document.getElementById('add-note').addEventListener('click', () => {{
+    modal.innerHTML = '<textarea name="message" maxlength="300"></textarea>'
+      + '<button id="send" aria-label="Send invitation">Send</button>';
+    document.getElementById('send').addEventListener('click', () => {{
+      modal.remove();
+      const button = document.getElementById('connect');
+      button.textContent = 'Pending';
+      button.setAttribute('aria-label', 'Pending, click to withdraw invitation');
+      button.insertAdjacentHTML('afterend', '<div class="artdeco-inline-feedback--success">Invitation sent</div>');
+    }});
+  }});
+}});
+</script>
+"""
+
+MESSAGE_ACTIONS = """
+<button id="message">Message</button>
+<script>
+document.getElementById('message').addEventListener('click', () => {{
+  const form = document.createElement('div');
+  form.className = 'msg-form';
+  form.innerHTML = '<div contenteditable="true" role="textbox"></div><button id="send" aria-label="Send">Send</button>';
+  document.body.appendChild(form);
+  document.getElementById('send').addEventListener('click', () => {{
+    form.querySelector('[role="textbox"]').textContent = '';
+  }});
+}});
+</script>
+"""
+
+# Results past the first batch are only rendered as the window scrolls;
+# the spacer keeps the page scrollable whatever the batch size
+SEARCH_BODY = """
+<ul id="results"></ul>
+<div style="height: 1200px"></div>
+<div id="footer">
+  <button class="artdeco-pagination__button--next" {next_disabled}>Next</button>
+</div>
+<script>
+const config = {config};
+let rendered = 0;
+function render() {{
+  const list = document.getElementById('results');
+  const end = Math.min(config.perPage, rendered + config.batch);
+  for (; rendered < end; rendered++) {{
+    const slug = 'bench-p' + config.page + '-' + (rendered + 1);
+    const item = document.createElement('li');
+    item.className = 'reusable-search__result-container';
+    item.innerHTML = '<span class="entity-result__title-text">'
+      + '<a class="app-aware-link" href="/in/' + slug + '/?miniProfileUrn=urn">Bench Person ' + slug + '</a></span>'
+      + '<div class="entity-result__primary-subtitle">CTO at Company ' + (rendered + 1) + '</div>';
+    list.appendChild(item);
+  }}
+  if (rendered >= config.perPage && config.last && !document.querySelector('.search-results__end-of-results')) {{
+    document.getElementById('footer').insertAdjacentHTML('beforeend', '<div class="search-results__end-of-results">No more results</div>');
+  }}
+}}
+render();
+window.addEventListener('scroll', render);
+</script>
+"""
+
+MESSAGING_BODY = """
+<ul class="msg-conversations-container__conversations-list"></ul>
+<script>
+const config = {config};
+let rendered = 0;
+function render() {{
+  const list = document.querySelector('.msg-conversations-container__conversations-list');
+  const end = Math.min(config.threads, rendered + config.batch);
+  for (; rendered < end; rendered++) {{
+    const id = rendered + 1;
+    const snippet = id % 3 === 0 ? 'You: Thanks, talk soon' : 'Happy to chat next week';
+    const item = document.createElement('li');
+    item.className = 'msg-conversation-listitem';
+    item.innerHTML = '<a class="msg-conversation-listitem__link" href="/messaging/thread/bench-' + id + '/">'
+      + '<h3 class="msg-conversation-listitem__participant-names">Bench Person ' + id + '</h3>'
+      + '<p class="msg-conversation-card__message-snippet">' + snippet + '</p>'
+      + '<time class="msg-conversation-listitem__time-stamp">10:42 AM</time></a>'
+      + '<a href="/in/connected-' + id + '/">Profile</a>';
+    list.appendChild(item);
+  }}
+}}
+render();
+document.querySelector('.msg-conversations-container__conversations-list').addEventListener('scroll', render);
+</script>
+"""
+
+NETWORK_BODY = """
+<ul>{cards}</ul>
+<button class="artdeco-pagination__button--next" disabled>Next</button>
+"""
+NETWORK_CARD = '<li class="{card_class}"><a href="/in/{slug}/">Bench Person {slug}</a></li>'
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "FakeLinkedIn/1.0"
+
+    @property
+    def fake(self) -> "FakeLinkedIn":
+        return self.server.fake
+
+    def log_message(self, format, *args):
+        if self.fake.verbose:
+            super().log_message(format, *args)
+
+    def _respond(self, status: int, body: str = "", headers: Optional[dict] = None):
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _page(self, title: str, body: str):
+        self._respond(200, PAGE.format(title=title, body=body))
+
+    def _redirect(self, location: str, headers: Optional[dict] = None):
+        self._respond(303, headers={"Location": location, **(headers or {})})
+
+    def _logged_in(self) -> bool:
+        cookies = self.headers.get("Cookie", "")
+        return any(part.strip().startswith(f"{SESSION_COOKIE}=") for part in cookies.split(";"))
+
+    def do_GET(self):
+        self.fake.record_request()
+        self.fake.delay()
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+
+        if url.path.startswith("/login"):
+            return self._page("Log in", LOGIN_BODY.format(error=""))
+        if not self._logged_in():
+            return self._redirect(f"/login?session_redirect={url.path}")
+
+        if url.path.rstrip("/") == "/feed":
+            return self._page("Feed", FEED_BODY)
+        if url.path.startswith("/in/"):
+            return self._profile(url.path[len("/in/"):].strip("/"))
+        if url.path.startswith("/search/results/people"):
+            return self._search(int(query.get("page", ["1"])[0]))
+        if url.path.rstrip("/") == "/messaging":
+            config = {"threads": self.fake.inbox_threads, "batch": self.fake.scroll_batch * 5}
+            return self._page("Messaging", MESSAGING_BODY.format(config=json.dumps(config)))
+        if url.path.startswith("/mynetwork/invitation-manager/sent"):
+            return self._network("Sent invitations", "invitation-card", [f"bench-p1-{i}" for i in range(1, 11)])
+        if url.path.startswith("/mynetwork/invite-connect/connections"):
+            return self._network("Connections", "mn-connection-card", [f"connected-{i}" for i in range(1, 21)])
+        self._respond(404, "Not found")
+
+    def do_POST(self):
+        self.fake.record_request()
+        self.fake.delay()
+        if urlparse(self.path).path != "/login":
+            return self._respond(404, "Not found")
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode())
+        if form.get("session_password", [""])[0] == "wrong":
+            error = '<div class="alert-content">Wrong email or password. Try again.</div>'
+            return self._page("Log in", LOGIN_BODY.format(error=error))
+        self._redirect("/feed", {"Set-Cookie": f"{SESSION_COOKIE}=bench-session; Path=/; HttpOnly"})
+
+    def _profile(self, slug: str):
+        name = html.escape(f"Bench Person {slug}")
+        template = MESSAGE_ACTIONS if slug.startswith("connected-") else CONNECT_ACTIONS
+        body = PROFILE_BODY.format(
+            name=name,
+            title="CTO",
+            company="Company 42",
+            actions=template.format(name=name),
+        )
+        self._page(name, body)
+
+    def _network(self, title: str, card_class: str, slugs):
+        cards = "".join(NETWORK_CARD.format(card_class=card_class, slug=slug) for slug in slugs)
+        self._page(title, NETWORK_BODY.format(cards=cards))
+
+    def _search(self, page_number: int):
+        config = {
+            "page": page_number,
+            "perPage": self.fake.results_per_page,
+            "batch": self.fake.scroll_batch,
+            "last": page_number >= self.fake.search_pages,
+        }
+        body = SEARCH_BODY.format(
+            config=json.dumps(config),
+            next_disabled="disabled" if config["last"] else "",
+        )
+        self._page("Search", body)
+
+
+class FakeLinkedIn:
+    """Serve the fixture pages from a background thread"""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        results_per_page: int = 10,
+        search_pages: int = 3,
+        scroll_batch: int = 4,
+        inbox_threads: int = 60,
+        verbose: bool = False,
+    ):
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.results_per_page = results_per_page
+        self.search_pages = search_pages
+        self.scroll_batch = scroll_batch
+        self.inbox_threads = inbox_threads
+        self.verbose = verbose
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def delay(self):
+        latency = self.latency_ms + random.uniform(0, self.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000)
+
+    def start(self) -> str:
+        self._server = ThreadingHTTPServer((self.host, self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-linkedin", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay added to every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Random extra delay, up to this much")
+    parser.add_argument("--results-per-page", type=int, default=10)
+    parser.add_argument("--search-pages", type=int, default=3)
+    parser.add_argument("--scroll-batch", type=int, default=4, help="Search results rendered per scroll")
+    parser.add_argument("--inbox-threads", type=int, default=60)
+    args = parser.parse_args()
+
+    fake = FakeLinkedIn(
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        results_per_page=args.results_per_page,
+        search_pages=args.search_pages,
+        scroll_batch=args.scroll_batch,
+        inbox_threads=args.inbox_threads,
+        verbose=True,
+    )
+    print(f"Fake LinkedIn listening on {fake.start()}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+"""
+Load test the API with dashboard users while a campaign runs against the fake LinkedIn
+
+    python -m benchmarks.load_test --database-url postgresql://.../linkedin_bench --users 50 --duration 120
+
+Starts benchmarks.fake_linkedin and the app (uvicorn in a subprocess) on the
+seeded database. The app points at the fake server and uses the template
+message generator, so no LinkedIn account or Mistral key is involved. A
+campaign of --campaign-profiles profiles is uploaded and started. Then
+--users virtual dashboard users replay a weighted mix of polling requests
+and CSV uploads for --duration seconds. Each user waits --think-ms (+-50%)
+between requests.
+
+Reports p50/p95/p99 latency, throughput and errors per endpoint, plus how
+far the campaign got. --target loads an instance that is already running
+instead; for its campaign to work, that instance must have
+LINKEDIN_BASE_URL set to the fake server on --fake-port.
+
+Needs httpx (pip install -r benchmarks/requirements.txt) and, for the
+campaign, playwright with Chromium.
+"""
+import argparse
+import asyncio
+import csv
+import io
+import itertools
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+from benchmarks.common import BACKEND_DIR, summarize, write_results, print_table
+from benchmarks.fake_linkedin import FakeLinkedIn
+
+CSV_HEADER = ["linkedinProfileUrl", "fullName", "companyName", "jobTitle"]
+
+
+def _csv(rows: List[List[str]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_HEADER)
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def _mix(profiles: int, connections: int, upload_rows: int, run_id: str) -> List[Dict[str, Any]]:
+    """Requests a dashboard user sends, weighted by how often the frontend sends them"""
+    uploads = itertools.count(1)
+
+    def upload(rng: random.Random):
+        batch = next(uploads)
+        rows = [
+            [f"https://www.linkedin.com/in/load-{run_id}-{batch}-{row}", f"Load Person {batch}-{row}", "Load Company", "CTO"]
+            for row in range(upload_rows)
+        ]
+        return "POST", "/api/profiles/upload", {"files": {"file": (f"load-{batch}.csv", _csv(rows), "text/csv")}}
+
+    return [
+        {"name": "GET /api/stats", "weight": 30, "request": lambda rng: ("GET", "/api/stats", {})},
+        {"name": "GET /api/profiles", "weight": 20,
+         "request": lambda rng: ("GET", "/api/profiles", {"params": {"skip": 0, "limit": 100}})},
+        {"name": "GET /api/profiles (page)", "weight": 5,
+         "request": lambda rng: ("GET", "/api/profiles", {"params": {"skip": rng.randrange(max(1, profiles - 100)), "limit": 100}})},
+        {"name": "GET /api/connections (status)", "weight": 10,
+         "request": lambda rng: ("GET", "/api/connections", {"params": {"status": rng.choice(["pending", "connected", "failed"])}})},
+        {"name": "GET /api/connections", "weight": 5, "request": lambda rng: ("GET", "/api/connections", {})},
+        {"name": "GET /api/messages", "weight": 20,
+         "request": lambda rng: ("GET", "/api/messages", {"params": {"connection_id": rng.randint(1, max(1, connections))}})},
+        {"name": "POST /api/profiles/upload", "weight": 2, "request": upload},
+    ]
+
+
+def _apply_weights(mix: List[Dict[str, Any]], overrides: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Apply --weight "GET /api/stats=10" overrides; a weight of 0 drops the request"""
+    weights = {case["name"]: case["weight"] for case in mix}
+    for override in overrides or []:
+        name, _, weight = override.rpartition("=")
+        if name not in weights:
+            raise SystemExit(f"Unknown request {name!r}; choose from {sorted(weights)}")
+        weights[name] = float(weight)
+    return [{**case, "weight": weights[case["name"]]} for case in mix if weights[case["name"]] > 0]
+
+
+async def _user(client, mix, rng: random.Random, deadline: float, think: float, samples: List[tuple]):
+    """One dashboard user: send a weighted random request, think, repeat"""
+    weights = [case["weight"] for case in mix]
+    while time.monotonic() < deadline:
+        case = rng.choices(mix, weights)[0]
+        method, path, kwargs = case["request"](rng)
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+            ok = response.status_code < 400
+        except Exception:
+            ok = False
+        samples.append((case["name"], (time.perf_counter() - start) * 1000, ok))
+        await asyncio.sleep(think * rng.uniform(0.5, 1.5))
+
+
+async def _start_campaign(client, fake: FakeLinkedIn, size: int, run_id: str) -> str:
+    """Upload profiles on the fake server and start connecting to them; returns their company"""
+    company = f"Load Campaign {run_id}"
+    rows = [[f"{fake.url}/in/campaign-{run_id}-{row}", f"Campaign Person {row}", company, "CTO"] for row in range(size)]
+    response = await client.post("/api/profiles/upload", files={"file": ("campaign.csv", _csv(rows), "text/csv")})
+    response.raise_for_status()
+    response = await client.get("/api/profiles", params={"company": company, "limit": 1000})
+    response.raise_for_status()
+    profile_ids = [profile["id"] for profile in response.json()]
+    response = await client.post("/api/connections/start", json={"profile_ids": profile_ids})
+    response.raise_for_status()
+    print(f"Campaign: {response.json().get('message')}")
+    return company
+
+
+async def _campaign_progress(client, company: str) -> Dict[str, int]:
+    response = await client.get("/api/profiles", params={"company": company, "limit": 1000})
+    response.raise_for_status()
+    progress: Dict[str, int] = defaultdict(int)
+    for profile in response.json():
+        progress[profile["connection_status"] or "not started"] += 1
+    return dict(progress)
+
+
+async def run_load(args, target: str, fake: FakeLinkedIn) -> Dict[str, Any]:
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with httpx.AsyncClient(base_url=target, timeout=args.timeout, limits=limits) as client:
+        stats = (await client.get("/api/stats")).json()
+        run_id = uuid.uuid4().hex[:8]
+        company = await _start_campaign(client, fake, args.campaign_profiles, run_id) if args.campaign_profiles else None
+
+        mix = _apply_weights(
+            _mix(stats["total_profiles"], stats["total_connections"], args.upload_rows, run_id),
+            args.weight,
+        )
+        samples: List[tuple] = []
+        print(f"Running {args.users} users for {args.duration}s against {target}")
+        started = time.monotonic()
+        deadline = started + args.duration
+        users = []
+        for index in range(args.users):
+            users.append(asyncio.create_task(
+                _user(client, mix, random.Random(args.seed + index), deadline, args.think_ms / 1000, samples)
+            ))
+            # Spread the users' start over the ramp-up so they don't poll in lockstep
+            await asyncio.sleep(args.ramp_up / args.users)
+        await asyncio.gather(*users)
+        elapsed = time.monotonic() - started
+
+        progress = await _campaign_progress(client, company) if company else {}
+
+    by_endpoint: Dict[str, List[tuple]] = defaultdict(list)
+    for name, latency, ok in samples:
+        by_endpoint[name].append((latency, ok))
+    results = []
+    for case in mix:
+        endpoint_samples = by_endpoint.get(case["name"])
+        if not endpoint_samples:
+            continue
+        results.append({
+            "name": case["name"],
+            **summarize([latency for latency, _ in endpoint_samples]),
+            "throughput_rps": round(len(endpoint_samples) / elapsed, 3),
+            "errors": sum(1 for _, ok in endpoint_samples if not ok),
+        })
+    results.append({
+        "name": "all requests",
+        **summarize([latency for _, latency, _ in samples]),
+        "throughput_rps": round(len(samples) / elapsed, 3),
+        "errors": sum(1 for _, _, ok in samples if not ok),
+    })
+    return {"results": results, "elapsed_s": round(elapsed, 3), "campaign": progress, "dataset": stats}
+
+
+def _spawn_app(args, fake: FakeLinkedIn, log) -> subprocess.Popen:
+    """Run the app on the benchmark database, pointed at the fake LinkedIn"""
+    session_dir = tempfile.mkdtemp(prefix="load-session-")
+    env = {
+        **os.environ,
+        "DATABASE_URL": args.database_url or os.environ.get("DATABASE_URL", ""),
+        "LINKEDIN_BASE_URL": fake.url,
+        "LINKEDIN_EMAIL": "bench@example.com",
+        "LINKEDIN_PASSWORD": "bench",
+        "MESSAGE_GENERATOR_BACKEND": "template",
+        "RATE_LIMIT_DELAY": str(args.campaign_delay),
+        "MAX_CONNECTIONS_PER_DAY": "1000000",
+        # Keep the fake session away from the real one
+        "BROWSER_SESSION_DIR": session_dir,
+    }
+    if not env["DATABASE_URL"]:
+        sys.exit("Set DATABASE_URL or pass --database-url")
+    command = [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", str(args.port), "--workers", str(args.workers),
+    ]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def _wait_until_healthy(target: str, process: Optional[subprocess.Popen], timeout: float = 120):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            sys.exit(f"The app exited with code {process.returncode} before becoming healthy")
+        try:
+            if httpx.get(f"{target}/health", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    sys.exit(f"{target} did not become healthy within {timeout:.0f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Seeded benchmark database (defaults to DATABASE_URL)")
+    parser.add_argument("--target", help="Base URL of an already running instance; skips starting the app")
+    parser.add_argument("--port", type=int, default=8100, help="Port of the app started by this script")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers of the app started by this script")
+    parser.add_argument("--fake-port", type=int, default=0, help="Port of the fake LinkedIn (default: any free port)")
+    parser.add_argument("--fake-latency-ms", type=float, default=100, help="Delay the fake LinkedIn adds to every response")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent dashboard users")
+    parser.add_argument("--duration", type=float, default=60, help="Seconds of load")
+    parser.add_argument("--ramp-up", type=float, default=5, help="Seconds over which users start")
+    parser.add_argument("--think-ms", type=float, default=1000, help="Mean pause between a user's requests")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument("--upload-rows", type=int, default=50, help="Rows per uploaded CSV")
+    parser.add_argument("--campaign-profiles", type=int, default=20, help="Profiles connected to during the test; 0 disables the campaign")
+    parser.add_argument("--campaign-delay", type=int, default=1, help="RATE_LIMIT_DELAY of the app started by this script")
+    parser.add_argument("--weight", action="append", help='Override a request weight, e.g. "GET /api/stats=10"; repeatable')
+    parser.add_argument("--seed", type=int, default=42, help="Random seed of the first user")
+    parser.add_argument("--output", help="JSON results file (default: benchmarks/results/load-<time>-<rev>.json)")
+    args = parser.parse_args()
+
+    fake = FakeLinkedIn(port=args.fake_port, latency_ms=args.fake_latency_ms)
+    fake.start()
+    print(f"Fake LinkedIn listening on {fake.url}")
+
+    process = None
+    log = None
+    target = args.target
+    try:
+        if target is None:
+            log = tempfile.NamedTemporaryFile("w", prefix="load-app-", suffix=".log", delete=False)
+            print(f"Starting the app on port {args.port} (log: {log.name})")
+            process = _spawn_app(args, fake, log)
+            target = f"http://127.0.0.1:{args.port}"
+        target = target.rstrip("/")
+        _wait_until_healthy(target, process)
+
+        run = asyncio.run(run_load(args, target, fake))
+    finally:
+        if process is not None:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        if log is not None:
+            log.close()
+        fake.stop()
+
+    print_table(run["results"], extra=("p99_ms", "throughput_rps", "errors"))
+    if run["campaign"]:
+        print(f"Campaign progress: {run['campaign']}")
+    context = {
+        "target": target,
+        "spawned": process is not None,
+        "workers": args.workers if process is not None else None,
+        "users": args.users,
+        "duration_s": run["elapsed_s"],
+        "think_ms": args.think_ms,
+        "fake_latency_ms": args.fake_latency_ms,
+        "campaign_profiles": args.campaign_profiles,
+        "campaign": run["campaign"],
+        "dataset": {key: run["dataset"].get(key) for key in ("total_profiles", "total_connections", "total_messages")},
+        "fake_linkedin_requests": fake.requests,
+    }
+    write_results("load", run["results"], context, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Seed a benchmark database with a large, realistic-looking dataset
+
+    python -m benchmarks.seed --database-url postgresql://.../linkedin_bench \
+        --profiles 1000000 --connections 500000 --messages 2000000
+
+Rows are generated deterministically and streamed in chunks: COPY FROM STDIN
+on Postgres, executemany on SQLite. The target database must be empty and
+disposable; the schema is created from the models with create_all.
+"""
+import argparse
+import csv
+import io
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+from benchmarks.common import use_database
+
+CHUNK_SIZE = 50_000
+# Connection status mix, roughly what a running campaign accumulates
+STATUS_WEIGHTS = [
+    ("CONNECTED", 40),
+    ("PENDING", 35),
+    ("FAILED", 15),
+    ("REJECTED", 8),
+    ("CONNECTING", 2),
+]
+FAILURE_REASONS = [
+    "Rate limit exceeded - too many requests",
+    "Navigation timeout - LinkedIn may be slow or blocking",
+    "Profile only allows following, not connecting",
+    "Connect button not found - profile may be restricted or connection not available",
+]
+COMPANIES = [f"Company {index}" for index in range(5_000)]
+TITLES = ["Founder", "CTO", "Head of Sales", "Engineering Manager", "Product Manager", "Consultant", "Developer"]
+
+
+def _timestamp(value: datetime) -> str:
+    """A format both Postgres and SQLAlchemy's SQLite DateTime parse"""
+    return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
+def _chunks(rows: Iterable[Tuple], size: int = CHUNK_SIZE) -> Iterator[List[Tuple]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _load(raw_connection, dialect: str, table: str, columns: Sequence[str], rows: Iterable[Tuple]) -> int:
+    """Bulk load rows into table, one chunk per round trip"""
+    cursor = raw_connection.cursor()
+    total = 0
+    try:
+        for chunk in _chunks(rows):
+            if dialect == "postgresql":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(("" if value is None else value for value in row) for row in chunk)
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            else:
+                placeholders = ", ".join("?" for _ in columns)
+                cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", chunk)
+            raw_connection.commit()
+            total += len(chunk)
+    finally:
+        cursor.close()
+    print(f"  {table}: {total} rows")
+    return total
+
+
+def seed(profiles: int, connections: int, messages: int, followup_ratio: float, inbound: int, random_seed: int):
+    from sqlalchemy import text
+    from app.database import engine, Base
+    import app.models  # noqa: F401  (registers every table with Base.metadata)
+
+    if connections > profiles:
+        raise SystemExit("--connections cannot exceed --profiles (one connection per profile)")
+    if messages < connections:
+        raise SystemExit("--messages must be at least --connections (every connection has an initial message)")
+
+    dialect = engine.dialect.name
+    Base.metadata.create_all(bind=engine)
+
+    with engine.connect() as connection:
+        if connection.execute(text("SELECT count(*) FROM profiles")).scalar():
+            raise SystemExit("The benchmark database must start empty")
+
+    rng = random.Random(random_seed)
+    now = datetime.utcnow()
+    statuses = [status for status, _ in STATUS_WEIGHTS]
+    weights = [weight for _, weight in STATUS_WEIGHTS]
+    connection_status = rng.choices(statuses, weights, k=connections)
+    connected_ids = [index + 1 for index, status in enumerate(connection_status) if status == "CONNECTED"]
+
+    def profile_rows():
+        for profile_id in range(1, profiles + 1):
+            yield (
+                profile_id,
+                f"Bench Person {profile_id}",
+                f"https://www.linkedin.com/in/bench-{profile_id}",
+                rng.choice(COMPANIES),
+                rng.choice(TITLES),
+                _timestamp(now - timedelta(minutes=rng.randrange(0, 365 * 24 * 60))),
+            )
+
+    def connection_rows():
+        for index, status in enumerate(connection_status):
+            connection_id = index + 1
+            created_at = now - timedelta(minutes=rng.randrange(0, 180 * 24 * 60))
+            yield (
+                connection_id,
+                connection_id,  # One connection per profile
+                status,
+                _timestamp(created_at + timedelta(days=rng.randrange(1, 14))) if status == "CONNECTED" else None,
+                rng.choice(FAILURE_REASONS) if status == "FAILED" else None,
+                0,
+                _timestamp(created_at),
+            )
+
+    def message_rows():
+        for message_id in range(1, messages + 1):
+            if message_id <= connections:
+                # The first `connections` ids are the initial messages, id == connection id
+                connection_id, message_type = message_id, "INITIAL"
+            else:
+                connection_id, message_type = rng.choice(connected_ids or [1]), "FOLLOWUP"
+            sent_at = _timestamp(now - timedelta(minutes=rng.randrange(0, 180 * 24 * 60)))
+            yield (message_id, connection_id, f"Benchmark message {message_id}", message_type, sent_at, sent_at)
+
+    def followup_rows():
+        followup_id = 0
+        for connection_id in connected_ids:
+            if rng.random() >= followup_ratio:
+                continue
+            followup_id += 1
+            scheduled_at = now + timedelta(minutes=rng.randrange(-30 * 24 * 60, 30 * 24 * 60))
+            status = "PENDING" if scheduled_at > now or rng.random() < 0.1 else "SENT"
+            yield (
+                followup_id,
+                connection_id,  # The initial message of that connection
+                _timestamp(scheduled_at),
+                _timestamp(scheduled_at) if status == "SENT" else None,
+                status,
+                _timestamp(now),
+            )
+
+    def inbound_rows():
+        for index, connection_id in enumerate(rng.sample(connected_ids, min(inbound, len(connected_ids)))):
+            yield (
+                index + 1,
+                f"https://www.linkedin.com/messaging/thread/bench-{index + 1}/",
+                f"https://www.linkedin.com/in/bench-{connection_id}",
+                f"Bench Person {connection_id}",
+                connection_id,
+                "Thanks for reaching out!",
+                _timestamp(now - timedelta(minutes=rng.randrange(0, 30 * 24 * 60))),
+            )
+
+    started = time.perf_counter()
+    print(f"Seeding {dialect} database")
+    raw_connection = engine.raw_connection()
+    try:
+        _load(raw_connection, dialect, "profiles",
+              ["id", "name", "linkedin_url", "company", "title", "created_at"], profile_rows())
+        _load(raw_connection, dialect, "connections",
+              ["id", "profile_id", "status", "connected_at", "failure_reason", "attempt_count", "created_at"], connection_rows())
+        _load(raw_connection, dialect, "messages",
+              ["id", "connection_id", "content", "message_type", "sent_at", "created_at"], message_rows())
+        _load(raw_connection, dialect, "followups",
+              ["id", "message_id", "scheduled_at", "sent_at", "status", "created_at"], followup_rows())
+        _load(raw_connection, dialect, "inbound_messages",
+              ["id", "thread_url", "profile_url", "participant_name", "connection_id", "snippet", "last_inbound_at"], inbound_rows())
+    finally:
+        raw_connection.close()
+
+    with engine.begin() as connection:
+        # Initial messages were generated with id == connection id
+        connection.execute(text("UPDATE connections SET connection_message_id = id"))
+        if dialect == "postgresql":
+            for table in ("profiles", "connections", "messages", "followups", "inbound_messages"):
+                connection.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT COALESCE(MAX(id), 1) FROM {table}))"))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("ANALYZE"))
+
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Benchmark database (defaults to DATABASE_URL)")
+    parser.add_argument("--profiles", type=int, default=1_000_000)
+    parser.add_argument("--connections", type=int, default=500_000)
+    parser.add_argument("--messages", type=int, default=2_000_000)
+    parser.add_argument("--followup-ratio", type=float, default=0.5, help="Share of connected connections with a follow-up")
+    parser.add_argument("--inbound", type=int, default=50_000, help="Inbound message threads")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed, for reproducible datasets")
+    args = parser.parse_args()
+
+    use_database(args.database_url)
+    seed(args.profiles, args.connections, args.messages, args.followup_ratio, args.inbound, args.seed)
+
+
+if __name__ == "__main__":
+    main()
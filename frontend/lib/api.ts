@@ -23,6 +23,8 @@ export interface Connection {
   connection_message: string | null
   connection_message_sent_at: string | null
   failure_reason: string | null
+  attempt_count: number
+  next_attempt_at: string | null
 }
 
 export interface Message {
@@ -45,6 +47,7 @@ export interface Stats {
   total_messages: number
   initial_messages: number
   followup_messages: number
+  replies_received: number
   response_rate: number
 }
 
@@ -179,9 +182,32 @@ export async function sendFollowUp(connection_id: number): Promise<{ message: st
   }
 }
 
+export interface ScrapeJob {
+  id: number
+  search_url: string
+  max_results: number
+  status: 'queued' | 'running' | 'completed' | 'failed'
+  next_page: number
+  profiles_found: number
+  profiles_created: number
+  error: string | null
+  created_at: string | null
+  finished_at: string | null
+}
+
+export async function getScrapeJob(job_id: number): Promise<ScrapeJob> {
+  const response = await fetch(`${API_URL}/api/profiles/scrape/${job_id}`)
+  if (!response.ok) {
+    const errorData = await response.json().catch(() => ({}))
+    throw new Error(errorData.detail || `Failed to fetch scrape job: ${response.statusText}`)
+  }
+  return response.json()
+}
+
 export async function scrapeLinkedInSearch(
   search_url: string,
-  max_results: number = 50
+  max_results: number = 50,
+  pollIntervalMs: number = 3000
 ): Promise<{ message: string; profiles_created: number; errors: string[] }> {
   try {
     const response = await fetch(`${API_URL}/api/profiles/scrape`, {
@@ -197,7 +223,21 @@ export async function scrapeLinkedInSearch(
       throw new Error(errorData.detail || `Failed to scrape LinkedIn search: ${response.statusText}`)
     }
 
-    return response.json()
+    // Scraping runs as a background job: poll its status until it finishes
+    const { job_id } = await response.json()
+    let job = await getScrapeJob(job_id)
+    while (job.status === 'queued' || job.status === 'running') {
+      await new Promise((resolve) => setTimeout(resolve, pollIntervalMs))
+      job = await getScrapeJob(job_id)
+    }
+
+    return {
+      message: job.status === 'completed'
+        ? `Successfully scraped and imported ${job.profiles_created} profiles`
+        : `Scrape stopped after ${job.profiles_created} profiles: ${job.error}`,
+      profiles_created: job.profiles_created,
+      errors: job.error ? [job.error] : [],
+    }
   } catch (error) {
     if (error instanceof Error) {
       throw error